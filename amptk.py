@@ -11,7 +11,8 @@ from natsort import natsorted
 URL = { 'ITS': 'https://uwmadison.box.com/shared/static/wft8j518ryvvcaenrzkilvbp7zwfwbrm.gz', 
         '16S': 'https://uwmadison.box.com/shared/static/a77ld44jmt82jtssnad3l6qnqocgm5jk.gz', 
         'LSU': 'https://uwmadison.box.com/shared/static/kvuxyngnpvh8942zzno7ijsfkkvpdhef.gz', 
-        'COI': 'https://uwmadison.box.com/shared/static/cptpdyp2i5olvoue6yr3kjf6o0ffhmx4.gz' }
+        'COI': 'https://uwmadison.box.com/shared/static/cptpdyp2i5olvoue6yr3kjf6o0ffhmx4.gz',
+        'phiX': 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=nuccore&id=NC_001422.1&rettype=fasta&retmode=text' }
 
 def flatten(l):
     flatList = []
@@ -127,6 +128,8 @@ Arguments:   -i, --fastq,--bam   Input BAM or FASTQ file (Required)
              --barcode_mismatch   Number of mismatches in barcode to allow. Default: 0
              --primer_mismatch   Number of mismatches in primers to allow. Default: 2
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
+             --workers           Run demux as threads or processes. Default: auto [auto,threads,processes]
              --mult_samples      Combine multiple chip runs, name prefix for chip
         """ % (sys.argv[1], version)
         
@@ -168,8 +171,9 @@ Arguments:   -i, --fastq         Input FASTQ file (Required)
              --reverse_barcode   FASTA file containing 3' barcodes. Default: none
              --full_length       Keep only full length sequences.
              --primer_mismatch   Number of mismatches in primers to allow. Default: 2
-             --merge_method      Software to use for PE merging. Default: usearch [usearch,vsearch]
+             --merge_method      Software to use for PE merging. Default: usearch [usearch,vsearch,native]
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
              -u, --usearch       USEARCH executable. Default: usearch9
         """ % (sys.argv[1], version)
         
@@ -210,8 +214,9 @@ Arguments:   -i, --fastq         Input folder of FASTQ files (Required)
              --primer_mismatch   Number of mismatches in primers to allow. Default: 2
              --barcode_mismatch   Number of mismatches in barcode to allow. Default: 1
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
              --cleanup           Remove intermediate files.
-             --merge_method      Software to use for PE merging. Default: usearch [usearch,vsearch]
+             --merge_method      Software to use for PE merging. Default: usearch [usearch,vsearch,native]
              -u, --usearch       USEARCH executable. Default: usearch9
         """ % (sys.argv[1], version)
         
@@ -250,6 +255,7 @@ Arguments:   -f, --forward       FASTQ R1 (forward) file (Required)
              --barcode_mismatch  Number of mismatches in index (barcodes) to allow. Default: 2
              -p, --pad           Pad reads with Ns if shorter than --trim_len. Default: off [on,off]
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
              --cleanup           Remove intermediate files.
              -u, --usearch       USEARCH executable. Default: usearch9
         """ % (sys.argv[1], version)  
@@ -288,6 +294,7 @@ Arguments:   -i, --sff, --fasta  Input file (SFF, FASTA, or FASTQ) (Required)
              --barcode_mismatch  Number of mismatches in barcode to allow. Default: 0
              --primer_mismatch   Number of mismatches in primers to allow. Default: 2
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
         """ % (sys.argv[1], version)
         
         arguments = sys.argv[2:]
@@ -323,6 +330,7 @@ Arguments:   -i, --fastq         Input folder of FASTQ files (Required)
              --require_primer    Require the Forward primer to be present. Default: on [on,off]
              --primer_mismatch   Number of mismatches in primers to allow. Default: 2
              --cpus              Number of CPUs to use. Default: all
+             --store             Also write a binary read store for fast sample selection.
              --cleanup           Remove intermediate files.
              -u, --usearch       USEARCH executable. Default: usearch9
         """ % (sys.argv[1], version)
@@ -357,6 +365,7 @@ Arguments:   -i, --fastq         Input FASTQ file (Required)
              --map_filtered      Map quality filtered reads back to OTUs. Default: off
              --unoise            Run De-noising pre-clustering (UNOISE). Default: off
              --debug             Keep intermediate files.
+             --cache             Cache filtering/dereplication files for re-runs. Default: off
              -u, --usearch       USEARCH executable. Default: usearch9
         """ % (sys.argv[1], version)
        
@@ -428,6 +437,7 @@ Arguments:   -i, --fastq         Input FASTQ file (Required)
              --pool              Pool all samples together for DADA2. Default: off
              --uchime_ref        Run Ref Chimera filtering. Default: off [ITS, LSU, COI, 16S, custom path]
              --debug             Keep intermediate files.
+             --cache             Cache filtering/dereplication files for re-runs. Default: off
         """ % (sys.argv[1], version)
        
         arguments = sys.argv[2:]
@@ -458,6 +468,7 @@ Arguments:   -i, --fastq         Input FASTQ file (Required)
              -u, --usearch       Path to USEARCH9. Default: usearch9
              --uchime_ref        Run Ref Chimera filtering. Default: off [ITS, LSU, COI, 16S, custom path]
              --debug             Keep intermediate files.
+             --cache             Cache filtering/dereplication files for re-runs. Default: off
         """ % (sys.argv[1], version)
         arguments = sys.argv[2:]
         if len(arguments) > 1:
@@ -870,9 +881,10 @@ version:     %s
 
 Description: Script downloads pre-formated databases for use with the `amptk taxonomy` 
              command. You can download databases for fungal ITS, bacterial 16S, fungal
-             LSU, or arthropod/chordate COI amplicons. 
+             LSU, or arthropod/chordate COI amplicons. phiX re-downloads the phiX174 genome
+             (shipped in DB/phiX.fa) used to screen phiX reads when merging Illumina PE reads.
     
-Arguments:   -i            Install Databases. Choices: ITS, 16S, LSU, COI
+Arguments:   -i            Install Databases. Choices: ITS, 16S, LSU, COI, phiX
              --force       Over-write existing databases
         """ % (sys.argv[1], version) 
 
@@ -887,6 +899,17 @@ Arguments:   -i            Install Databases. Choices: ITS, 16S, LSU, COI
                     print help
                     sys.exit(1)
                 for x in arguments:
+                    if x == 'phiX':
+                        phix = os.path.join(script_path, 'DB', 'phiX.fa')
+                        if os.path.isfile(phix) and not '--force' in arguments:
+                            print("phiX genome was found, to overwrite use '--force'.")
+                            sys.exit(1)
+                        print "Downloading phiX174 genome (NC_001422.1)"
+                        u = urllib2.urlopen(URL.get(x))
+                        with open(phix, 'w') as output:
+                            output.write(u.read())
+                        print "phiX genome installed"
+                        continue
                     if os.path.isfile(os.path.join(script_path, 'DB', x+'.udb')):
                         if not '--force' in arguments:
                             print("A formated database was found, to overwrite use '--force'. You can add more custom databases by using the `amptk database` command.")
@@ -895,7 +918,7 @@ Arguments:   -i            Install Databases. Choices: ITS, 16S, LSU, COI
                     if not x in URL:
                         if x == '--force':
                             continue
-                        print "%s not valid, choices are ITS, 16S, LSU, COI" % x
+                        print "%s not valid, choices are ITS, 16S, LSU, COI, phiX" % x
                         sys.exit(1)
                     print "Downloading %s pre-formatted database" % x
                     address = URL.get(x)
@@ -8,6 +8,7 @@ currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfram
 parentdir = os.path.dirname(currentdir)
 sys.path.insert(0,parentdir)
 import lib.amptklib as amptklib
+import lib.uc2otutable as uc2otutable
 
 #get script path for directory
 script_path = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -38,6 +39,7 @@ parser.add_argument('--uchime_ref', help='Run UCHIME REF [ITS,16S,LSU,COI,custom
 parser.add_argument('--map_filtered', action='store_true', help='map quality filtered reads back to OTUs')
 parser.add_argument('--unoise', action='store_true', help='Run De-noising (UNOISE)')
 parser.add_argument('--debug', action='store_true', help='Remove Intermediate Files')
+parser.add_argument('--cache', action='store_true', help='Use and store cached intermediate files (also on if $AMPTK_CACHE is set)')
 args=parser.parse_args()
 
 #remove logfile if exists
@@ -62,13 +64,12 @@ tmp = args.out + '_tmp'
 if not os.path.exists(tmp):
     os.makedirs(tmp)
 
-#Count FASTQ records
+#cache of the filtering/dereplication steps, keyed on input file contents and options
+cache = amptklib.StageCache(enabled=args.cache)
+
+#Count FASTQ records, from the demux index if there is one
 amptklib.log.info("Loading FASTQ Records")
-#convert to FASTA for mapping
-orig_fasta = os.path.join(tmp, args.out+'.orig.fa')
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastaout', orig_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-orig_total = amptklib.countfasta(orig_fasta)
+orig_total = amptklib.countfastq(args.FASTQ)
 size = amptklib.checkfastqsize(args.FASTQ)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
@@ -77,17 +78,33 @@ amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 filter_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fq')
 filter_fasta = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fa')
 amptklib.log.info("Quality Filtering, expected errors < %s" % args.maxee)
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastq_maxee', str(args.maxee), '--fastqout', filter_out, '--fastaout', filter_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfastq(filter_out)
+filterkey = cache.key('filter', [args.FASTQ], [args.maxee])
+cached = cache.fetch(filterkey, [filter_out, filter_fasta])
+if cached is None:
+    cached = {'total': amptklib.EEFilter(args.FASTQ, filter_out, maxee=args.maxee, fasta=filter_fasta)[1]}
+    cache.store(filterkey, [filter_out, filter_fasta], cached)
+total = cached['total']
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
-#now run full length dereplication
+#now run full length dereplication, output is sorted by size
 derep_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.derep.fa')
+sort_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.sort.fa')
 amptklib.log.info("De-replication (remove duplicate reads)")
-cmd = ['vsearch', '--derep_fulllength', filter_fasta, '--sizeout', '--output', derep_out]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfasta(derep_out)
+if args.unoise:
+    derepkey = cache.key('derep', [filterkey], [1])
+    derep_files = [derep_out]
+else:
+    #nothing in between, so remove uniques below minsize in the same pass
+    derepkey = cache.key('derep', [filterkey], [args.minsize])
+    derep_files = [sort_out]
+cached = cache.fetch(derepkey, derep_files)
+if cached is None:
+    if args.unoise:
+        cached = {'total': amptklib.dereplicate(filter_fasta, derep_out)[1]}
+    else:
+        cached = {'total': amptklib.dereplicate(filter_fasta, sort_out, minsize=args.minsize)[1]}
+    cache.store(derepkey, derep_files, cached)
+total = cached['total']
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
 #optional run UNOISE
@@ -98,13 +115,11 @@ if args.unoise:
     amptklib.runSubprocess(cmd, amptklib.log)   
     total = amptklib.countfasta(unoise_out)
     amptklib.log.info('{0:,}'.format(total) + ' reads passed')
-else:
-    unoise_out = derep_out
 
-#now sort my size remove singletons
-sort_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.sort.fa')
-cmd = ['vsearch', '--sortbysize', unoise_out, '--minsize', args.minsize, '--output', sort_out]
-amptklib.runSubprocess(cmd, amptklib.log)   
+    #now sort my size remove singletons, sort_out could be linked to the cache from an earlier run
+    amptklib.removefile(sort_out)
+    cmd = ['vsearch', '--sortbysize', unoise_out, '--minsize', args.minsize, '--output', sort_out]
+    amptklib.runSubprocess(cmd, amptklib.log)
 
 #now run clustering algorithm
 radius = str(100 - int(args.pct_otu))
@@ -157,13 +172,14 @@ otu_table = os.path.join(tmp, args.out + '.EE' + args.maxee + '.otu_table.txt')
 if args.map_filtered:
     reads = filter_fasta
 else:
-    reads = orig_fasta
+    #the demux FASTQ is dereplicated as it is read, no FASTA copy needed
+    reads = args.FASTQ
 amptklib.log.info("Mapping Reads to OTUs and Building OTU table")
-cmd = ['vsearch', '--usearch_global', reads, '--strand', 'plus', '--id', '0.97', '--db', uchime_out, '--uc', uc_out, '--otutabout', otu_table]
-amptklib.runSubprocess(cmd, amptklib.log)
+uniques = amptklib.mapUniques(reads, uchime_out, uc_out)
+table = uc2otutable.OTUTabOut(uc_out, otu_table, Uniques=uniques, DB=uchime_out)
 
 #count reads mapped
-total = amptklib.line_count2(uc_out)
+total = table.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to OTUs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
 #Move files around, delete tmp if argument passed.
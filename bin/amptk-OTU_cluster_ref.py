@@ -9,6 +9,8 @@ currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfram
 parentdir = os.path.dirname(currentdir)
 sys.path.insert(0,parentdir)
 import lib.amptklib as amptklib
+import lib.uc as uc
+import lib.uc2otutable as uc2otutable
 import pandas as pd
 
 #get script path for directory
@@ -126,13 +128,9 @@ else:
             amptklib.log.error("%s not pre-installed DB, must then also specify valid UTAX database via --utax_db" % args.db)
             sys.exit(1)
 
-#Count FASTQ records
+#Count FASTQ records, from the demux index if there is one
 amptklib.log.info("Loading FASTQ Records")
-#convert to FASTA for mapping
-orig_fasta = os.path.join(tmp, args.out+'.orig.fa')
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastaout', orig_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-orig_total = amptklib.countfasta(orig_fasta)
+orig_total = amptklib.countfastq(args.FASTQ)
 size = amptklib.checkfastqsize(args.FASTQ)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
@@ -141,24 +139,14 @@ amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 filter_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fq')
 filter_fasta = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fa')
 amptklib.log.info("Quality Filtering, expected errors < %s" % args.maxee)
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastq_maxee', str(args.maxee), '--fastqout', filter_out, '--fastaout', filter_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-qtrimtotal = amptklib.countfastq(filter_out)
+qtrimtotal = amptklib.EEFilter(args.FASTQ, filter_out, maxee=args.maxee, fasta=filter_fasta)[1]
 amptklib.log.info('{0:,}'.format(qtrimtotal) + ' reads passed')
-#now run full length dereplication
-derep_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.derep.fa')
-amptklib.log.info("De-replication (remove duplicate reads)")
-cmd = ['vsearch', '--derep_fulllength', filter_fasta, '--sizeout', '--output', derep_out]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfasta(derep_out)
-amptklib.log.info('{0:,}'.format(total) + ' reads passed')
-
-#now run sort by size
+#now run full length dereplication, sorted by size and removing reads seen less than minsize times
 sort_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.sort.fa')
+amptklib.log.info("De-replication (remove duplicate reads)")
+readtotal, uniques, total = amptklib.dereplicate(filter_fasta, sort_out, minsize=args.minsize)
+amptklib.log.info('{0:,}'.format(uniques) + ' reads passed')
 amptklib.log.info("Sorting reads by size: removing reads seen less than %s times" % args.minsize)
-cmd = ['vsearch', '--sortbysize', derep_out, '--minsize', args.minsize, '--output', sort_out]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfasta(sort_out)
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
 #chimera detection
@@ -189,22 +177,19 @@ amptklib.runSubprocess(cmd, amptklib.log)
 #parse results
 ref_results = {}
 nohits = []
-with open(align_out, 'rU') as alignment:
-    for line in alignment:
-        line = line.replace('\n', '')
-        col = line.split('\t')
-        counts = col[8].split(';')
-        counts = int(counts[1].replace('size=', ''))
-        if col[3] == '*':
-            nohits.append(col[8])
-            continue
-        if float(col[3]) >= float(args.id):
-            if not col[8] in ref_results:
-                ref_results[col[8]] = (col[9], col[3], counts)
-            else:
-                print "Error: %s duplicated ID" % col[8]
+for rec in uc.Records(align_out, ['Type', 'PctId', 'QueryLabel', 'TargetLabel']):
+    counts = rec.QueryLabel.split(';')
+    counts = int(counts[1].replace('size=', ''))
+    if rec.Type == 'N':
+        nohits.append(rec.QueryLabel)
+        continue
+    if rec.PctId >= float(args.id):
+        if not rec.QueryLabel in ref_results:
+            ref_results[rec.QueryLabel] = (rec.TargetLabel, '%.1f' % rec.PctId, counts)
         else:
-            nohits.append(col[8])
+            print "Error: %s duplicated ID" % rec.QueryLabel
+    else:
+        nohits.append(rec.QueryLabel)
 
 #summarize results from first ref clustering
 num_refcluster = len(ref_results)
@@ -295,13 +280,14 @@ otu_table = os.path.join(tmp, args.out + '.EE' + args.maxee + '.otu_table.txt')
 if args.map_filtered:
     reads = filter_fasta
 else:
-    reads = orig_fasta
+    #the demux FASTQ is dereplicated as it is read, no FASTA copy needed
+    reads = args.FASTQ
 amptklib.log.info("Mapping Reads to OTUs and Building OTU table")
-cmd = ['vsearch', '--usearch_global', reads, '--strand', 'plus', '--id', '0.97', '--db', otu_clean, '--uc', uc_out, '--otutabout', otu_table]
-amptklib.runSubprocess(cmd, amptklib.log)
+uniques = amptklib.mapUniques(reads, otu_clean, uc_out)
+table = uc2otutable.OTUTabOut(uc_out, otu_table, Uniques=uniques, DB=otu_clean)
 
 #count reads mapped
-total = amptklib.line_count2(uc_out)
+total = table.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to OTUs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
 #Move files around, delete tmp if argument passed.
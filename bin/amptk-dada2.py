@@ -7,6 +7,7 @@ currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfram
 parentdir = os.path.dirname(currentdir)
 sys.path.insert(0,parentdir)
 import lib.amptklib as amptklib
+import lib.uc2otutable as uc2otutable
 import numpy as np
 from natsort import natsorted
 
@@ -34,6 +35,7 @@ parser.add_argument('--platform', default='ion', choices=['ion', 'illumina', '45
 parser.add_argument('--uchime_ref', help='Run UCHIME REF [ITS,16S,LSU,COI,custom]')
 parser.add_argument('--pool', action='store_true', help='Pool all sequences together for DADA2')
 parser.add_argument('--debug', action='store_true', help='Keep all intermediate files')
+parser.add_argument('--cache', action='store_true', help='Use and store cached intermediate files (also on if $AMPTK_CACHE is set)')
 parser.add_argument('-u','--usearch', dest="usearch", default='usearch9', help='USEARCH9 EXE')
 args=parser.parse_args()
 
@@ -105,11 +107,15 @@ amptklib.log.info("R v%s; DADA2 v%s" % (Rversions[0], Rversions[1]))
 #Count FASTQ records and remove 3' N's as dada2 can't handle them
 amptklib.log.info("Loading FASTQ Records")
 no_ns = args.out+'.cleaned_input.fq'
-amptklib.fastq_strip_padding(args.fastq, no_ns)
-demuxtmp = args.out+'.original.fa'
-cmd = ['vsearch', '--fastq_filter', os.path.abspath(no_ns),'--fastq_qmax', '55', '--fastaout', demuxtmp]
-amptklib.runSubprocess(cmd, amptklib.log)
-orig_total = amptklib.countfasta(demuxtmp)
+#cache of the filtering steps, keyed on input file contents and options
+cache = amptklib.StageCache(enabled=args.cache)
+origkey = cache.key('dada2orig', [args.fastq], [])
+cached = cache.fetch(origkey, [no_ns])
+if cached is None:
+    amptklib.fastq_strip_padding(args.fastq, no_ns)
+    cached = {'total': amptklib.countfastq(no_ns)}
+    cache.store(origkey, [no_ns], cached)
+orig_total = cached['total']
 size = amptklib.checkfastqsize(no_ns)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
@@ -117,9 +123,12 @@ amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 #quality filter
 amptklib.log.info("Quality Filtering, expected errors < %s" % args.maxee)
 derep = args.out+'.qual-filtered.fq'
-filtercmd = ['vsearch', '--fastq_filter', no_ns, '--fastq_maxee', str(args.maxee), '--fastqout', derep, '--fastq_qmax', '55', '--fastq_maxns', '0']
-amptklib.runSubprocess(filtercmd, amptklib.log)
-total = amptklib.countfastq(derep)
+filterkey = cache.key('dada2filter', [origkey], [args.maxee])
+cached = cache.fetch(filterkey, [derep])
+if cached is None:
+    cached = {'total': amptklib.EEFilter(no_ns, derep, maxee=args.maxee, maxns=0)[1]}
+    cache.store(filterkey, [derep], cached)
+total = cached['total']
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
 #split into individual files
@@ -234,48 +243,41 @@ else:
 dadademux = args.out+'.dada2.map.uc'
 bioSeqs = args.out+'.cluster.otus.fa'
 bioTable = args.out+'.cluster.otu_table.txt'
-uctmp = args.out+'.map.uc'
 ClusterComp = args.out+'.iSeqs2clusters.txt'
 
 #map reads to DADA2 OTUs
 amptklib.log.info("Mapping reads to DADA2 iSeqs")
-cmd = ['vsearch', '--usearch_global', demuxtmp, '--db', iSeqs, '--id', '0.97', '--uc', dadademux, '--strand', 'plus', '--otutabout', chimeraFreeTable ]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.line_count2(dadademux)
+uniques = amptklib.mapUniques(no_ns, iSeqs, dadademux)
+iSeqTable = uc2otutable.OTUTabOut(dadademux, chimeraFreeTable, Uniques=uniques, DB=iSeqs)
+total = iSeqTable.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to iSeqs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
-#cluster
+#cluster, the .uc says which OTU each iSeq went to
 amptklib.log.info("Clustering iSeqs at %s%% to generate biological OTUs" % args.pct_otu)
 radius = float(args.pct_otu) / 100.
-cmd = ['vsearch', '--cluster_smallmem', iSeqs, '--centroids', bioSeqs, '--id', str(radius), '--strand', 'plus', '--relabel', 'OTU', '--qmask', 'none', '--usersort']
+iSeqmap = args.out+'.iseq_map.uc'
+cmd = ['vsearch', '--cluster_smallmem', iSeqs, '--centroids', bioSeqs, '--uc', iSeqmap, '--id', str(radius), '--strand', 'plus', '--relabel', 'OTU', '--qmask', 'none', '--usersort']
 amptklib.runSubprocess(cmd, amptklib.log)
 total = amptklib.countfasta(bioSeqs)
 amptklib.log.info('{0:,}'.format(total) + ' OTUs generated')
 
 #determine where iSeqs clustered
-iSeqmap = args.out+'.iseq_map.uc'
-cmd = ['vsearch', '--usearch_global', iSeqs, '--db', bioSeqs, '--id', str(radius), '--uc', iSeqmap, '--strand', 'plus']
-amptklib.runSubprocess(cmd, amptklib.log)
+iSeq2OTU = uc2otutable.ClusterMap(iSeqmap)
 iSeqMapped = {}
-with open(iSeqmap, 'rU') as mapping:
-    for line in mapping:
-        line = line.replace('\n', '')
-        cols = line.split('\t')
-        OTU = cols[9]
-        Hit = cols[8]
-        if not OTU in iSeqMapped:
-            iSeqMapped[OTU] = [Hit]
-        else:
-            iSeqMapped[OTU].append(Hit)
+for Hit in natsorted(iSeq2OTU):
+    OTU = iSeq2OTU[Hit]
+    if not OTU in iSeqMapped:
+        iSeqMapped[OTU] = [Hit]
+    else:
+        iSeqMapped[OTU].append(Hit)
 with open(ClusterComp, 'w') as clusters:
     clusters.write('OTU\tiSeqs\n')
     for k,v in natsorted(iSeqMapped.items()):
         clusters.write('%s\t%s\n' % (k, ', '.join(v)))
-#create OTU table
-amptklib.log.info("Mapping reads to OTUs")
-cmd = ['vsearch', '--usearch_global', demuxtmp, '--db', bioSeqs, '--id', '0.97', '--uc', uctmp, '--strand', 'plus', '--otutabout', bioTable]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.line_count2(uctmp)
+#create OTU table from the reads to iSeqs mapping, reads are counted for the OTU their iSeq clustered into
+amptklib.log.info("Building OTU table from iSeq mapping")
+table = uc2otutable.OTUTabOut(dadademux, bioTable, Targets=iSeq2OTU, Uniques=uniques, DB=bioSeqs)
+total = table.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to OTUs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
 if not args.debug:
@@ -283,8 +285,6 @@ if not args.debug:
     shutil.rmtree(filtfolder)
     amptklib.removefile(dada2out)
     amptklib.removefile(derep)
-    amptklib.removefile(demuxtmp)
-    amptklib.removefile(uctmp)
     amptklib.removefile(iSeqmap)
     amptklib.removefile(dadademux)
 
@@ -254,14 +254,14 @@ def stripPrimer(records):
             Seq = rec.seq
             MAX_PRIMER_MISMATCHES = int(args.primer_mismatch)
             revPrimer = revcomp_lib.RevComp(RevPrimer)
-            BestPosFor, BestDiffsFor = primer.BestMatch2(Seq, FwdPrimer, MAX_PRIMER_MISMATCHES)
+            BestPosFor, BestDiffsFor = primer.BestMatchFast(Seq, FwdPrimer, MAX_PRIMER_MISMATCHES)
             if BestDiffsFor < MAX_PRIMER_MISMATCHES:
                 if BestPosFor > 0:
                     stripfwdlen = fwdLen + BestPosFor
                     StripSeq = Seq[stripfwdlen:]
 
                     #now look for reverse
-                    BestPosRev, BestDiffsRev = primer.BestMatch2(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
+                    BestPosRev, BestDiffsRev = primer.BestMatchFast(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
                     if BestDiffsRev < MAX_PRIMER_MISMATCHES:
                         StrippedSeq = StripSeq[:BestPosRev]
                     else:
@@ -274,14 +274,14 @@ def stripPrimer(records):
                         yield rec
             else: #if can't find forward primer, try to reverse complement and look again
                 RevSeq = revcomp_lib.RevComp(Seq)
-                BestPosFor, BestDiffsFor = primer.BestMatch2(RevSeq, FwdPrimer, MAX_PRIMER_MISMATCHES)
+                BestPosFor, BestDiffsFor = primer.BestMatchFast(RevSeq, FwdPrimer, MAX_PRIMER_MISMATCHES)
                 if BestDiffsFor < MAX_PRIMER_MISMATCHES:
                     if BestPosFor > 0:
                         stripfwdlen = fwdLen + BestPosFor
                         StripSeq = Seq[stripfwdlen:]
 
                         #now look for reverse
-                        BestPosRev, BestDiffsRev = primer.BestMatch2(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
+                        BestPosRev, BestDiffsRev = primer.BestMatchFast(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
                         if BestDiffsRev < MAX_PRIMER_MISMATCHES:
                             StrippedSeq = StripSeq[:BestPosRev]
                         else:
@@ -296,7 +296,7 @@ def stripPrimer(records):
                     if args.keep_all:
                         StripSeq = Seq
                         #now look for reverse
-                        BestPosRev, BestDiffsRev = primer.BestMatch2(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
+                        BestPosRev, BestDiffsRev = primer.BestMatchFast(StripSeq, revPrimer, MAX_PRIMER_MISMATCHES)
                         if BestDiffsRev < MAX_PRIMER_MISMATCHES:
                             StrippedSeq = StripSeq[:BestPosRev]
                         else:
@@ -193,18 +193,11 @@ else:
                     name = ID + ".fastq"
                 continue
             Barcodes[name]=line.strip()
+    BarcodeIndex = amptklib.BarcodeIndex(Barcodes, args.barcode_mismatch)
     
-    #check for compressed input file
-    if args.FASTQ.endswith('.gz'):
-        amptklib.log.info("Gzipped input files detected, uncompressing")
-        FASTQ_IN = args.FASTQ.replace('.gz', '')
-        amptklib.Funzip(args.FASTQ, FASTQ_IN, multiprocessing.cpu_count())
-    else:
-        FASTQ_IN = args.FASTQ
-   
-    #count FASTQ records in input
+    #count FASTQ records in input, gzipped input is read as a stream
     amptklib.log.info("Loading FASTQ Records")
-    total = amptklib.countfastq(FASTQ_IN)
+    total = amptklib.countfastq(args.FASTQ)
     size = amptklib.checkfastqsize(args.FASTQ)
     readablesize = amptklib.convertSize(size)
     amptklib.log.info('{0:,}'.format(total) + ' reads (' + readablesize + ')')
@@ -218,10 +211,12 @@ else:
         amptklib.log.info("Looking for %i barcodes that must have FwdPrimer: %s and  RevPrimer: %s" % (len(Barcodes), FwdPrimer, RevPrimer))
     
     #this will loop through FASTQ file once, splitting those where barcodes are found, and primers trimmed
+    #each sample is compressed as it is written, one gzip stream per sample
     runningTotal = 0
-    with open(FASTQ_IN, 'rU') as input:
+    outputs = {}
+    with amptklib.zopen(args.FASTQ) as input:
         for title, seq, qual in FastqGeneralIterator(input):
-            Barcode, BarcodeLabel = amptklib.AlignBarcode(seq, Barcodes, args.barcode_mismatch)
+            Barcode, BarcodeLabel = BarcodeIndex.search(seq)
             if Barcode == "":
                 continue
             #trim barcode from sequence
@@ -243,9 +238,11 @@ else:
             if len(seq) < args.min_len: #filter out sequences less than minimum length.
                 continue
             runningTotal += 1
-            fileout = os.path.join(args.out, BarcodeLabel)
-            with open(fileout, 'ab') as output:
-                output.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+            if not BarcodeLabel in outputs:
+                outputs[BarcodeLabel] = gzip.open(os.path.join(args.out, BarcodeLabel+'.gz'), 'wb', 6)
+            outputs[BarcodeLabel].write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+    for output in outputs.values():
+        output.close()
                 
     if args.require_primer == 'off':   
         amptklib.log.info('{0:,}'.format(runningTotal) + ' total reads with valid barcode')
@@ -254,12 +251,6 @@ else:
     elif args.require_primer == 'both':
         amptklib.log.info('{0:,}'.format(runningTotal) + ' total reads with valid barcode and both primers')
     
-    amptklib.log.info("Now Gzipping files")
-    for file in os.listdir(args.out):
-        if file.endswith(".fastq"):
-        file_path = os.path.join(args.out, file)
-        amptklib.Fzip_inplace(file_path)
-    
     #after all files demuxed into output folder, loop through and create SRA metadata file
     filelist = []
     for file in os.listdir(args.out):
@@ -267,9 +258,6 @@ else:
             filelist.append(file)
 
 amptklib.log.info("Finished: output in %s" % args.out)
-#clean up if gzipped
-if args.FASTQ.endswith('.gz'):
-    amptklib.removefile(FASTQ_IN)
 
 #check for BioSample meta file
 if args.biosample:
@@ -36,9 +36,10 @@ parser.add_argument('--primer_mismatch', default=2, type=int, help='Number of mi
 parser.add_argument('--barcode_mismatch', default=1, type=int, help='Number of mis-matches allowed in index')
 parser.add_argument('--rescue_forward', default='on', choices=['on', 'off'], help='Rescue Not-merged forward reads')
 parser.add_argument('--min_len', default=100, type=int, help='Minimum read length to keep')
-parser.add_argument('--merge_method', default='usearch', choices=['usearch', 'vsearch'], help='Software to use for PE read merging')
+parser.add_argument('--merge_method', default='usearch', choices=['usearch', 'vsearch', 'native'], help='Software to use for PE read merging')
 parser.add_argument('-l','--trim_len', default=300, type=int, help='Trim length for reads')
 parser.add_argument('--cpus', type=int, help="Number of CPUs. Default: auto")
+parser.add_argument('--store', action='store_true', help='Also write a binary read store (.store) of the demux file')
 parser.add_argument('--full_length', action='store_true', help='Keep only full length reads (no trimming/padding)')
 parser.add_argument('-p','--pad', default='off', choices=['on', 'off'], help='Pad with Ns to a set length')
 parser.add_argument('-u','--usearch', dest="usearch", default='usearch9', help='USEARCH executable')
@@ -52,72 +53,111 @@ def processRead(input):
     Name = os.path.basename(input).split(".fq",-1)[0]
     DemuxOut = os.path.join(args.out, Name + '.demux.fq')
     Sample = Name.split('_')[0]
-    StatsOut = os.path.join(args.out, Name+'.stats')
+    progress = amptklib.Progress()
+    Bytes = 0 #approximate bytes read, for the progress ETA
     Total = 0
     NoPrimer = 0
     TooShort = 0
     RevPrimerFound = 0
     ValidSeqs = 0
-    with open(StatsOut, 'w') as counts:
-        with open(DemuxOut, 'w') as out:
-            for title, seq, qual in FastqGeneralIterator(open(input)):
-                Total += 1
-                #first thing is look for forward primer, if found trim it off
-                foralign = edlib.align(FwdPrimer, seq, mode="HW", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                #if require primer is on make finding primer in amplicon required if amplicon is larger than read length
-                #if less than read length, can't enforce primer because could have been trimmed via staggered trim in fastq_mergepairs
-                if args.primer == 'on' and len(seq) > ReadLen:
-                    if foralign["editDistance"] < 0:
-                        NoPrimer += 1
-                        continue
+    PrimerWindow = 0 #primer hits in the anchored window
+    PrimerFull = 0 #primer hits that needed the full read search
+    with open(DemuxOut, 'w') as out:
+        for title, seq, qual in FastqGeneralIterator(open(input)):
+            Total += 1
+            Bytes += len(title) + len(seq) + len(qual) + 6
+            if Total % 10000 == 0:
+                progress.update([Total, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull], Bytes)
+            #first thing is look for forward primer, if found trim it off
+            foralign, hit = amptklib.anchoredPrimer(FwdPrimer, seq, args.primer_mismatch)
+            if hit == 'window':
+                PrimerWindow += 1
+            elif hit == 'full':
+                PrimerFull += 1
+            #if require primer is on make finding primer in amplicon required if amplicon is larger than read length
+            #if less than read length, can't enforce primer because could have been trimmed via staggered trim in fastq_mergepairs
+            if args.primer == 'on' and len(seq) > ReadLen:
+                if foralign["editDistance"] < 0:
+                    NoPrimer += 1
+                    continue
+                ForCutPos = foralign["locations"][0][1]+1
+                Seq = seq[ForCutPos:]
+                Qual = qual[ForCutPos:]
+            else:
+                if foralign["editDistance"] >= 0:
                     ForCutPos = foralign["locations"][0][1]+1
                     Seq = seq[ForCutPos:]
                     Qual = qual[ForCutPos:]
                 else:
-                    if foralign["editDistance"] >= 0:
-                        ForCutPos = foralign["locations"][0][1]+1
-                        Seq = seq[ForCutPos:]
-                        Qual = qual[ForCutPos:]
-                    else:
-                        NoPrimer += 1
-                        Seq = seq
-                        Qual = qual
-                #now look for reverse primer
-                revalign = edlib.align(RevPrimer, Seq, mode="HW", task="locations", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                if revalign["editDistance"] >= 0:
-                    RevPrimerFound += 1
-                    RevCutPos = revalign["locations"][0][0]
-                    #location to trim sequences, trim seqs
-                    Seq = Seq[:RevCutPos]
-                    Qual = Qual[:RevCutPos]
-                else:
-                    if args.full_length and len(Seq) > ReadLen: #if full length and no primer found, exit, except if len is less than read length
-                        continue
-                #if full_length is passed, then only trim primers
-                if not args.full_length:
-                    #got here if primers were found they were trimmed
-                    #now check seq length, pad if too short, trim if too long
-                    if len(Seq) < args.min_len: #need this check here or primer dimers will get through
-                        TooShort += 1
-                        continue
-                    if len(Seq) < args.trim_len and args.pad == 'on':
-                        pad = args.trim_len - len(Seq)
-                        Seq = Seq + pad*'N'
-                        Qual = Qual + pad*'J'
-                    else: #len(Seq) > args.trim_len:
-                        Seq = Seq[:args.trim_len]
-                        Qual = Qual[:args.trim_len]
-                #got here, reads are primers trimmed and trim/padded, check length
-                if len(Seq) < args.min_len:
+                    NoPrimer += 1
+                    Seq = seq
+                    Qual = qual
+            #now look for reverse primer
+            revalign, hit = amptklib.anchoredPrimer(RevPrimer, Seq, args.primer_mismatch, end=True)
+            if hit == 'window':
+                PrimerWindow += 1
+            elif hit == 'full':
+                PrimerFull += 1
+            if revalign["editDistance"] >= 0:
+                RevPrimerFound += 1
+                RevCutPos = revalign["locations"][0][0]
+                #location to trim sequences, trim seqs
+                Seq = Seq[:RevCutPos]
+                Qual = Qual[:RevCutPos]
+            else:
+                if args.full_length and len(Seq) > ReadLen: #if full length and no primer found, exit, except if len is less than read length
+                    continue
+            #if full_length is passed, then only trim primers
+            if not args.full_length:
+                #got here if primers were found they were trimmed
+                #now check seq length, pad if too short, trim if too long
+                if len(Seq) < args.min_len: #need this check here or primer dimers will get through
                     TooShort += 1
                     continue
-                ValidSeqs += 1     
-                #now fix header
-                Title = 'R_'+str(ValidSeqs)+';barcodelabel='+Sample+';'
-                #now write to file
-                out.write("@%s\n%s\n+\n%s\n" % (Title, Seq, Qual))
-            counts.write("%i,%i,%i,%i,%i\n" % (Total, NoPrimer, RevPrimerFound, TooShort, ValidSeqs))
+                if len(Seq) < args.trim_len and args.pad == 'on':
+                    pad = args.trim_len - len(Seq)
+                    Seq = Seq + pad*'N'
+                    Qual = Qual + pad*'J'
+                else: #len(Seq) > args.trim_len:
+                    Seq = Seq[:args.trim_len]
+                    Qual = Qual[:args.trim_len]
+            #got here, reads are primers trimmed and trim/padded, check length
+            if len(Seq) < args.min_len:
+                TooShort += 1
+                continue
+            ValidSeqs += 1     
+            #now fix header
+            Title = 'R_'+str(ValidSeqs)+';barcodelabel='+Sample+';'
+            #now write to file
+            out.write("@%s\n%s\n+\n%s\n" % (Title, Seq, Qual))
+        progress.update([Total, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull], os.path.getsize(input))
         
+#gzipped files are read as a stream, so take .fastq.gz as well as .fastq (but not both copies)
+def isFASTQ(file):
+    if file.endswith('.fastq'):
+        return True
+    if file.endswith('.fastq.gz') and not os.path.isfile(os.path.join(args.input, file[:-3])):
+        return True
+    return False
+
+def copyFASTQ(input, output):
+    with amptklib.zopen(input) as infile:
+        with open(output+'.tmp', 'w') as outfile:
+            shutil.copyfileobj(infile, outfile)
+    os.rename(output+'.tmp', output)
+
+def mergeSample(input):
+    #input is a tuple of (name, R1, R2, read_length, index, threads), returns False if merging failed
+    name, for_reads, rev_reads, read_length, Index, threads = input
+    try:
+        amptklib.MergeReads(for_reads, rev_reads, args.out, name+'.fq', read_length, args.min_len, args.usearch, args.rescue_forward, args.merge_method, Index, args.barcode_mismatch, threads, name)
+    except SystemExit:
+        return False
+    except Exception as e:
+        amptklib.log.debug("%s: %s" % (name, e))
+        return False
+    return True
+
 #sometimes people add slashes in the output directory, this could be bad, try to fix it
 args.out = re.sub(r'\W+', '', args.out)
             
@@ -147,19 +187,6 @@ if not args.cpus:
 else:
     cpus = args.cpus
 
-#check folder if files are gzipped, then gunzip them
-#try to gunzip files
-gzip_list = []
-for file in os.listdir(args.input):
-    if file.endswith(".fastq.gz"):
-        gzip_list.append(file)
-if gzip_list:
-    amptklib.log.info("Gzipped files detected, uncompressing")
-    for file in gzip_list:
-        amptklib.log.debug("Uncompressing %s" % file)
-        OutName = os.path.join(args.input, os.path.splitext(file)[0])
-        amptklib.Funzip(os.path.join(args.input, file), OutName, cpus) 
-
 #check for mapping file, if exists, then use names from first column only for filenames
 if args.mapping_file:
     if not os.path.isfile(args.mapping_file):
@@ -175,7 +202,7 @@ if args.mapping_file:
     filenames = []
     for file in os.listdir(args.input):
         if file.startswith(tuple(sample_names)):
-            if file.endswith('.fastq'):
+            if isFASTQ(file):
                 filenames.append(file)
     
     if len(filenames) < 1:
@@ -189,7 +216,7 @@ else: #if not then search through and find all the files you can in the folder
     #now get the FASTQ files and proceed
     filenames = []
     for file in os.listdir(args.input):
-        if file.endswith(".fastq"):
+        if isFASTQ(file):
             filenames.append(file)
     #look up primer db otherwise default to entry
     if args.F_primer in amptklib.primer_db:
@@ -208,7 +235,7 @@ if args.sra:
     for x in filenames:
         rename = os.path.basename(x).split(".fastq",-1)[0]
         sampleDict[rename] = 'unknown'
-        shutil.copyfile(os.path.join(args.input, x), os.path.join(args.out, rename+'.fq'))
+        copyFASTQ(os.path.join(args.input, x), os.path.join(args.out, rename+'.fq'))
     ReadLen = args.min_len
 else:
     if len(filenames) % 2 != 0:
@@ -260,6 +287,7 @@ else:
         amptklib.log.info("Merging Overlaping Pairs using USEARCH")
 
     ReadLengths = []
+    mergeJobs = []
     for i in range(0,len(fastq_for)):
         name = fastq_for[i].split("_")[0]
         outname = name + '.fq'
@@ -272,7 +300,7 @@ else:
                 read_length = args.read_length
             else:
                 read_length = amptklib.GuessRL(for_reads)
-            amptklib.log.info("working on sample %s (Read Length: %i)" % (name, read_length))
+            amptklib.log.debug("working on sample %s (Read Length: %i)" % (name, read_length))
             #append read lengths for processReads function
             ReadLengths.append(read_length)
             #checked for merged output, skip if it exists
@@ -282,12 +310,34 @@ else:
             #if PE reads, then need to merge them
             if args.reads == 'paired' and amptklib.check_valid_file(rev_reads):
                 Index = sampleDict.get(name).replace('-', '')
-                amptklib.MergeReads(for_reads, rev_reads, args.out, name+'.fq', read_length, args.min_len, args.usearch, args.rescue_forward, args.merge_method, Index, args.barcode_mismatch)
+                mergeJobs.append((name, for_reads, rev_reads, read_length, Index))
             else:
-                shutil.copy(for_reads, os.path.join(args.out, outname))
+                copyFASTQ(for_reads, os.path.join(args.out, outname))
         else:
             amptklib.log.debug("ERROR: %s file is empty, skipping" % for_reads)
 
+    #run several samples at once, splitting the cpus between the concurrent merging jobs
+    if mergeJobs:
+        jobs = min(cpus, len(mergeJobs))
+        threads = max(1, cpus // jobs)
+        amptklib.log.info("Merging %i samples, %i at a time using %i threads each" % (len(mergeJobs), jobs, threads))
+        mergeJobs = [x + (threads,) for x in mergeJobs]
+        failed = []
+        if jobs == 1:
+            for x in mergeJobs:
+                if not mergeSample(x):
+                    failed.append(x[0])
+        else:
+            p = multiprocessing.Pool(jobs)
+            for name, success in zip([x[0] for x in mergeJobs], p.imap(mergeSample, mergeJobs)):
+                if not success:
+                    failed.append(name)
+            p.close()
+            p.join()
+        if failed:
+            amptklib.log.error("Merging failed for: %s, exiting" % ', '.join(failed))
+            sys.exit(1)
+
     #get read lengths for process read function
     ReadLen = max(set(ReadLengths))
 
@@ -315,49 +365,46 @@ amptklib.log.info("splitting the job over %i cpus, but this may still take awhil
 RevPrimer = revcomp_lib.RevComp(RevPrimer)
 amptklib.log.info("Foward primer: %s,  Rev comp'd rev primer: %s" % (FwdPrimer, RevPrimer))
 
-#finally process reads over number of cpus
-amptklib.runMultiProgress(processRead, file_list, cpus)
+#finally process reads over number of cpus, workers send back their counts
+#(Total, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull)
+finalstats = amptklib.runMultiProgress(processRead, file_list, cpus, size=sum(os.path.getsize(x) for x in file_list))
 print "-------------------------------------------------------"
 #Now concatenate all of the demuxed files together
 amptklib.log.info("Concatenating Demuxed Files")
 
+#stream straight into the compressed output, counting the reads per sample and read lengths on the way
 catDemux = args.out + '.demux.fq'
-with open(catDemux, 'wb') as outfile:
+FinalDemux = catDemux+'.gz'
+BarcodeCount = {}
+BarcodeLengths = {}
+with amptklib.zopen(FinalDemux, 'w', cpus) as outfile:
     for filename in glob.glob(os.path.join(args.out,'*.demux.fq')):
         if filename == catDemux:
             continue
         with open(filename, 'rU') as readfile:
-            shutil.copyfileobj(readfile, outfile)
+            for i, line in enumerate(readfile):
+                outfile.write(line)
+                if i % 4 == 0:
+                    ID = line.split("=")[-1].split(";")[0]
+                    if ID not in BarcodeCount:
+                        BarcodeCount[ID] = 1
+                    else:
+                        BarcodeCount[ID] += 1
+                elif i % 4 == 1:
+                    length = len(line.rstrip())
+                    BarcodeLengths[length] = BarcodeLengths.get(length, 0) + 1
+#save the sample index so amptk show/select don't need to read the file again
+amptklib.writeSidecar(FinalDemux, sum(BarcodeCount.values()), sum(k*v for k, v in BarcodeLengths.items()), samples=BarcodeCount, lengths=BarcodeLengths)
 
-#parse the stats
-#(Total, NoPrimer, RevPrimerFound, TooShort, ValidSeqs))
-finalstats = [0,0,0,0,0]
-for file in os.listdir(args.out):
-    if file.endswith('.stats'):
-        with open(os.path.join(args.out, file), 'rU') as statsfile:
-            line = statsfile.readline()
-            line = line.replace('\n', '')
-            newstats = line.split(',')
-            newstats = [int(i) for i in newstats]
-            for x, num in enumerate(newstats):
-                finalstats[x] += num           
+if not finalstats:
+    finalstats = [0,0,0,0,0,0,0]
 
 #output stats of the run
 amptklib.log.info('{0:,}'.format(finalstats[0])+' total reads')
 amptklib.log.info('{0:,}'.format(finalstats[0]-finalstats[1])+' Fwd Primer found, {0:,}'.format(finalstats[2])+ ' Rev Primer found')
 amptklib.log.info('{0:,}'.format(finalstats[3])+' discarded too short (< %i bp)' % args.min_len)
 amptklib.log.info('{0:,}'.format(finalstats[4])+' valid output reads')
-
-#now loop through data and find barcoded samples, counting each.....
-BarcodeCount = {}
-with open(catDemux, 'rU') as input:
-    header = itertools.islice(input, 0, None, 4)
-    for line in header:
-        ID = line.split("=")[-1].split(";")[0]
-        if ID not in BarcodeCount:
-            BarcodeCount[ID] = 1
-        else:
-            BarcodeCount[ID] += 1
+amptklib.log.debug('Primer search: {0:,}'.format(finalstats[5])+' found in anchored window, {0:,}'.format(finalstats[6])+' needed full read search')
 
 #now let's count the barcodes found and count the number of times they are found.
 barcode_counts = "%30s:  %s" % ('Sample', 'Count')
@@ -370,19 +417,13 @@ if not args.mapping_file:
     genericmapfile = args.out + '.mapping_file.txt'
     amptklib.CreateGenericMappingFileIllumina(sampleDict, FwdPrimer, revcomp_lib.RevComp(RevPrimer), genericmapfile)
 
-#compress the output to save space
-FinalDemux = catDemux+'.gz'
-amptklib.Fzip(catDemux, FinalDemux, cpus)
-amptklib.removefile(catDemux)
-if gzip_list:
-    for file in gzip_list:
-        file = file.replace('.gz', '')
-        amptklib.removefile(os.path.join(args.input, file))
-
 #get file size
 filesize = os.path.getsize(FinalDemux)
 readablesize = amptklib.convertSize(filesize)
 amptklib.log.info("Output file:  %s (%s)" % (FinalDemux, readablesize))
+if args.store:
+    amptklib.buildStore(FinalDemux)
+    amptklib.log.info("Read store:   %s" % amptklib.storeName(FinalDemux))
 amptklib.log.info("Mapping file: %s" % genericmapfile)
 if args.cleanup:
     shutil.rmtree(args.out)
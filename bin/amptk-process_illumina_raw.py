@@ -42,87 +42,96 @@ parser.add_argument('-l','--trim_len', default=300, type=int, help='Trim length
 parser.add_argument('-p','--pad', default='off', choices=['on', 'off'], help='Pad with Ns to a set length')
 parser.add_argument('--full_length', action='store_true', help='Keep only full length reads (no trimming/padding)')
 parser.add_argument('--cpus', type=int, help="Number of CPUs. Default: auto")
+parser.add_argument('--store', action='store_true', help='Also write a binary read store (.store) of the demux file')
 parser.add_argument('-u','--usearch', dest="usearch", default='usearch9', help='USEARCH9 EXE')
 args=parser.parse_args()
 
 def processRead(input):
-    #input is expected to be a FASTQ file
-    #local variables that need to be previously declared: ForPrimer, RevPrimer, indexReads, discard
-    Name = os.path.basename(input).split(".fq",-1)[0]
+    #input is expected to be a (start, end) byte range of the merged FASTQ file
+    #local variables that need to be previously declared: MergedFile, ForPrimer, RevPrimer
+    #sample is already in the read header from amptklib.annotateIndex
+    Name = 'chunk_'+str(input[0])
     DemuxOut = os.path.join(tmpdir, Name + '.demux.fq')
     Sample = Name.split('_')[0]
-    StatsOut = os.path.join(tmpdir, Name+'.stats')
+    progress = amptklib.Progress()
+    Bytes = 0 #approximate bytes read, for the progress ETA
     Total = 0
-    NoBC = 0
+    NoBC = 0 #reads without a matching index are dropped before merging
     NoPrimer = 0
     TooShort = 0
     RevPrimerFound = 0
     ValidSeqs = 0
-    with open(StatsOut, 'w') as counts:
-        with open(DemuxOut, 'w') as out:
-            for title, seq, qual in FastqGeneralIterator(open(input)):
-                Total += 1
-                #check if in discard
-                readID = title.split(' ')[0]
-                if readID in discard:
-                    NoBC += 1
+    PrimerWindow = 0 #primer hits in the anchored window
+    PrimerFull = 0 #primer hits that needed the full read search
+    with open(DemuxOut, 'w') as out:
+        for title, seq, qual in amptklib.read_fastq_range(MergedFile, input[0], input[1]):
+            Total += 1
+            Bytes += len(title) + len(seq) + len(qual) + 6
+            if Total % 10000 == 0:
+                progress.update([Total, NoBC, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull], Bytes)
+            #first thing is look for forward primer, if found trim it off
+            foralign, hit = amptklib.anchoredPrimer(FwdPrimer, seq, args.primer_mismatch)
+            if hit == 'window':
+                PrimerWindow += 1
+            elif hit == 'full':
+                PrimerFull += 1
+            #if require primer is on make finding primer in amplicon required if amplicon is larger than read length
+            #if less than read length, can't enforce primer because could have been trimmed via staggered trim in fastq_mergepairs
+            if args.primer == 'on' and len(seq) > ReadLen:
+                if foralign["editDistance"] < 0:
+                    NoPrimer += 1
                     continue
-                #first thing is look for forward primer, if found trim it off
-                foralign = edlib.align(FwdPrimer, seq, mode="HW", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                #if require primer is on make finding primer in amplicon required if amplicon is larger than read length
-                #if less than read length, can't enforce primer because could have been trimmed via staggered trim in fastq_mergepairs
-                if args.primer == 'on' and len(seq) > ReadLen:
-                    if foralign["editDistance"] < 0:
-                        NoPrimer += 1
-                        continue
+                ForCutPos = foralign["locations"][0][1]+1
+                Seq = seq[ForCutPos:]
+                Qual = qual[ForCutPos:]
+            else:
+                if foralign["editDistance"] >= 0:
                     ForCutPos = foralign["locations"][0][1]+1
                     Seq = seq[ForCutPos:]
                     Qual = qual[ForCutPos:]
                 else:
-                    if foralign["editDistance"] >= 0:
-                        ForCutPos = foralign["locations"][0][1]+1
-                        Seq = seq[ForCutPos:]
-                        Qual = qual[ForCutPos:]
-                    else:
-                        NoPrimer += 1
-                        Seq = seq
-                        Qual = qual
-                #now look for reverse primer
-                revalign = edlib.align(RevPrimer, Seq, mode="HW", task="locations", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                if revalign["editDistance"] >= 0:
-                    RevPrimerFound += 1
-                    RevCutPos = revalign["locations"][0][0]
-                    #location to trim sequences, trim seqs
-                    Seq = Seq[:RevCutPos]
-                    Qual = Qual[:RevCutPos]
-                else:
-                    if args.full_length and len(Seq) > ReadLen: #if full length and no primer found, exit, except if len is less than read length
-                        continue
-                #if full_length is passed, then only trim primers
-                if not args.full_length:
-                    #got here if primers were found they were trimmed
-                    #now check seq length, pad if too short, trim if too long
-                    if len(Seq) < args.min_len: #need this check here or primer dimers will get through
-                        TooShort += 1
-                        continue
-                    if len(Seq) < args.trim_len and args.pad == 'on':
-                        pad = args.trim_len - len(Seq)
-                        Seq = Seq + pad*'N'
-                        Qual = Qual + pad*'J'
-                    else: #len(Seq) > args.trim_len:
-                        Seq = Seq[:args.trim_len]
-                        Qual = Qual[:args.trim_len]
-                #got here, reads are primers trimmed and trim/padded, check length
-                if len(Seq) < args.min_len:
+                    NoPrimer += 1
+                    Seq = seq
+                    Qual = qual
+            #now look for reverse primer
+            revalign, hit = amptklib.anchoredPrimer(RevPrimer, Seq, args.primer_mismatch, end=True)
+            if hit == 'window':
+                PrimerWindow += 1
+            elif hit == 'full':
+                PrimerFull += 1
+            if revalign["editDistance"] >= 0:
+                RevPrimerFound += 1
+                RevCutPos = revalign["locations"][0][0]
+                #location to trim sequences, trim seqs
+                Seq = Seq[:RevCutPos]
+                Qual = Qual[:RevCutPos]
+            else:
+                if args.full_length and len(Seq) > ReadLen: #if full length and no primer found, exit, except if len is less than read length
+                    continue
+            #if full_length is passed, then only trim primers
+            if not args.full_length:
+                #got here if primers were found they were trimmed
+                #now check seq length, pad if too short, trim if too long
+                if len(Seq) < args.min_len: #need this check here or primer dimers will get through
                     TooShort += 1
                     continue
-                ValidSeqs += 1     
-                #now fix header
-                header = indexReads.get(readID)
-                Title = 'R_'+str(ValidSeqs)+';barcodelabel='+header[0]+';bcseq='+header[1]+';bcdiffs='+str(header[2])+';'
-                #now write to file
-                out.write("@%s\n%s\n+\n%s\n" % (Title, Seq, Qual))
-            counts.write("%i,%i,%i,%i,%i,%i\n" % (Total, NoBC, NoPrimer, RevPrimerFound, TooShort, ValidSeqs))
+                if len(Seq) < args.trim_len and args.pad == 'on':
+                    pad = args.trim_len - len(Seq)
+                    Seq = Seq + pad*'N'
+                    Qual = Qual + pad*'J'
+                else: #len(Seq) > args.trim_len:
+                    Seq = Seq[:args.trim_len]
+                    Qual = Qual[:args.trim_len]
+            #got here, reads are primers trimmed and trim/padded, check length
+            if len(Seq) < args.min_len:
+                TooShort += 1
+                continue
+            ValidSeqs += 1     
+            #now fix header, keep the barcodelabel;bcseq;bcdiffs annotation
+            Title = 'R_'+str(ValidSeqs)+';'+title.split(';', 1)[-1]
+            #now write to file
+            out.write("@%s\n%s\n+\n%s\n" % (Title, Seq, Qual))
+        progress.update([Total, NoBC, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull], input[1] - input[0])
 
 
 args.out = re.sub(r'\W+', '', args.out)
@@ -197,8 +206,7 @@ else:
 
 amptklib.log.info("Loading %i samples from mapping file" % len(mapdict))
 
-#process the index file, lookup in mapping file sample name, return dictionary
-#will return dictionary:  readID : (SampleID, BC, mismatches) and list of reads to be discarded
+#process the index file, lookup in mapping file sample name
 amptklib.log.info("Mapping barcodes to sample IDs")
 combined_index = os.path.join(tmpdir, 'indexes.fq')
 if len(args.index) > 1:
@@ -208,7 +216,10 @@ if len(args.index) > 1:
                 shutil.copyfileobj(readfile, outfile)
 else:
     combined_index = args.index[0]
-indexReads, discard = amptklib.barcodes2dict(combined_index, mapdict, args.barcode_mismatch)
+#stream index reads alongside R1/R2, sample ID goes into the read headers and reads without a match are dropped
+annotated_R1 = os.path.join(tmpdir, 'annotated_R1.fq')
+annotated_R2 = os.path.join(tmpdir, 'annotated_R2.fq')
+IndexTotal, IndexNoMatch = amptklib.annotateIndex(combined_index, args.fastq, args.reverse, mapdict, args.barcode_mismatch, annotated_R1, annotated_R2)
 
 #estimate read length
 if amptklib.check_valid_file(args.fastq):
@@ -220,7 +231,7 @@ if amptklib.check_valid_file(args.fastq):
 
 #Count FASTQ records
 amptklib.log.info("Loading FASTQ Records")
-orig_total = amptklib.countfastq(args.fastq)
+orig_total = IndexTotal
 size = amptklib.checkfastqsize(args.fastq)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
@@ -228,7 +239,7 @@ amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 #now we can merge the reads
 mergedReads = args.out+'.merged.fastq'
 amptklib.log.info("Merging PE reads using VSEARCH and filtering for phiX")
-amptklib.MergeReads(args.fastq, args.reverse, tmpdir, mergedReads, ReadLen, args.min_len, args.usearch, args.rescue_forward, 'vsearch', '', args.barcode_mismatch)
+amptklib.MergeReads(annotated_R1, annotated_R2, tmpdir, mergedReads, ReadLen, args.min_len, args.usearch, args.rescue_forward, 'vsearch', '', args.barcode_mismatch)
 
 if not args.full_length:
     if args.pad == 'off':
@@ -239,24 +250,19 @@ else:
     amptklib.log.info("Stripping primers and keeping only full length sequences")
 amptklib.log.info("splitting the job over %i cpus, but this may still take awhile" % (cpus))
 
-#now process the reads, have single file, so split like ion and run over multiple cores
-#split fastq file
-amptklib.split_fastq(os.path.join(tmpdir, mergedReads), orig_total, tmpdir, cpus*2)    
-
+#now process the reads, have single file, so split into byte ranges and run over multiple cores
+MergedFile = os.path.join(tmpdir, mergedReads)
+file_list = amptklib.split_fastq_ranges(MergedFile, cpus*2)
 
 #start here to process the reads, first reverse complement the reverse primer
 RevPrimer = revcomp_lib.RevComp(RevPrimer)
 amptklib.log.info("Foward primer: %s,  Rev comp'd rev primer: %s" % (FwdPrimer, RevPrimer))
 
-#now get file list from tmp folder
-file_list = []
-for file in os.listdir(tmpdir):
-    if file.endswith(".fq"):
-        file = os.path.join(tmpdir, file)
-        file_list.append(file)
-
-#finally process reads over number of cpus
-amptklib.runMultiProgress(processRead, file_list, cpus)
+#finally process reads over number of cpus, workers send back their counts
+#(Total, NoBC, NoPrimer, RevPrimerFound, TooShort, ValidSeqs, PrimerWindow, PrimerFull)
+finalstats = amptklib.runMultiProgress(processRead, file_list, cpus, size=os.path.getsize(MergedFile))
+if not finalstats:
+    finalstats = [0,0,0,0,0,0,0,0]
 
 print "-------------------------------------------------------"
 #Now concatenate all of the demuxed files together
@@ -269,26 +275,15 @@ with open(tmpDemux, 'wb') as outfile:
             continue
         with open(filename, 'rU') as readfile:
             shutil.copyfileobj(readfile, outfile)
-#parse the stats
-finalstats = [0,0,0,0,0,0]
-for file in os.listdir(tmpdir):
-    if file.endswith('.stats'):
-        with open(os.path.join(tmpdir, file), 'rU') as statsfile:
-            line = statsfile.readline()
-            line = line.replace('\n', '')
-            newstats = line.split(',')
-            newstats = [int(i) for i in newstats]
-            for x, num in enumerate(newstats):
-                finalstats[x] += num
+#reads without an index match never made it to the merged file
+finalstats[0] += IndexNoMatch
+finalstats[1] = IndexNoMatch
 
 #finally reindex output
 #last thing is to re-number of reads as it is possible they could have same name from multitprocessor split
-Demux = args.out + '.demux.fq'
-amptklib.fastqreindex(tmpDemux, Demux)
-os.remove(tmpDemux)
-
-#clean up tmp folder
-shutil.rmtree(tmpdir)
+#written straight to the compressed output
+FinalDemux = args.out + '.demux.fq.gz'
+amptklib.fastqreindex(tmpDemux, FinalDemux)
 
 #output stats of the run
 amptklib.log.info('{0:,}'.format(finalstats[0])+' total reads')
@@ -296,17 +291,10 @@ amptklib.log.info('{0:,}'.format(finalstats[1])+' discarded no index match')
 amptklib.log.info('{0:,}'.format(finalstats[0]-finalstats[1]-finalstats[2])+' Fwd Primer found, {0:,}'.format(finalstats[3])+ ' Rev Primer found')
 amptklib.log.info('{0:,}'.format(finalstats[4])+' discarded too short (< %i bp)' % args.min_len)
 amptklib.log.info('{0:,}'.format(finalstats[5])+' valid output reads')
+amptklib.log.debug('Primer search: {0:,}'.format(finalstats[6])+' found in anchored window, {0:,}'.format(finalstats[7])+' needed full read search')
 
-#now loop through data and find barcoded samples, counting each.....
-BarcodeCount = {}
-with open(Demux, 'rU') as input:
-    header = itertools.islice(input, 0, None, 4)
-    for line in header:
-        ID = line.split("=",1)[-1].split(";")[0]
-        if ID not in BarcodeCount:
-            BarcodeCount[ID] = 1
-        else:
-            BarcodeCount[ID] += 1
+#reads per sample were counted while reindexing and saved in the sample index
+BarcodeCount, BarcodeLengths = amptklib.sampleIndex(FinalDemux)
 
 #now let's count the barcodes found and count the number of times they are found.
 barcode_counts = "%30s:  %s" % ('Sample', 'Count')
@@ -314,16 +302,16 @@ for k,v in natsorted(BarcodeCount.items(), key=lambda (k,v): v, reverse=True):
     barcode_counts += "\n%30s:  %s" % (k, str(BarcodeCount[k]))
 amptklib.log.info("Found %i barcoded samples\n%s" % (len(BarcodeCount), barcode_counts))
 
-#compress the output to save space
-FinalDemux = Demux+'.gz'
-amptklib.Fzip(Demux, FinalDemux, cpus)
-amptklib.removefile(Demux)
-
+#clean up tmp folder
+shutil.rmtree(tmpdir)
 
 #get file size
 filesize = os.path.getsize(FinalDemux)
 readablesize = amptklib.convertSize(filesize)
 amptklib.log.info("Output file:  %s (%s)" % (FinalDemux, readablesize))
+if args.store:
+    amptklib.buildStore(FinalDemux)
+    amptklib.log.info("Read store:   %s" % amptklib.storeName(FinalDemux))
 amptklib.log.info("Mapping file: %s" % args.mapping_file)
 print "-------------------------------------------------------"
 if 'win32' in sys.platform:
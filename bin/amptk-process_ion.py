@@ -41,21 +41,23 @@ parser.add_argument('--min_len', default=100, type=int, help='Minimum read lengt
 parser.add_argument('-l','--trim_len', default=300, type=int, help='Trim length for reads')
 parser.add_argument('--full_length', action='store_true', help='Keep only full length reads (no trimming/padding)')
 parser.add_argument('--mult_samples', dest="multi", default='False', help='Combine multiple samples (i.e. FACE1)')
-parser.add_argument('--merge_method', default='usearch', choices=['usearch', 'vsearch'], help='Software to use for PE read merging')
+parser.add_argument('--merge_method', default='usearch', choices=['usearch', 'vsearch', 'native'], help='Software to use for PE read merging')
 parser.add_argument('--illumina', action='store_true', help='Input data is single file Illumina')
 parser.add_argument('--ion', action='store_true', help='Input data is Ion Torrent')
 parser.add_argument('--454', action='store_true', help='Input data is 454')
 parser.add_argument('--reverse', help='Illumina reverse reads')
 parser.add_argument('--cpus', type=int, help="Number of CPUs. Default: auto")
+parser.add_argument('--store', action='store_true', help='Also write a binary read store (.store) of the demux file')
+parser.add_argument('--workers', default='auto', choices=['auto', 'threads', 'processes'], help="Run demux workers as threads or processes. Default: auto")
 parser.add_argument('-u','--usearch', dest="usearch", default='usearch9', help='USEARCH EXE')
 args=parser.parse_args()
 
-def processRead(input):
-    base = os.path.basename(input).split('.')[0]
+def processRead(records):
+    #input is a batch of FASTQ records (title, seq, qual) from amptklib.demuxStream
+    #return the demuxed reads as (BarcodeLabel, Seq, Qual) along with counts, reads get renamed by the writer
     PL = len(FwdPrimer)
     RL = len(RevPrimer)
-    DemuxOut = os.path.join(tmpdir, base+'.demux.fq')
-    StatsOut = os.path.join(tmpdir, base+'.stats')
+    Demuxed = []
     Total = 0
     NoBarcode = 0
     NoRevBarcode = 0
@@ -63,78 +65,86 @@ def processRead(input):
     TooShort = 0
     RevPrimerFound = 0
     ValidSeqs = 0
-    with open(StatsOut, 'w') as counts:
-        with open(DemuxOut, 'w') as out:   
-            for title, seq, qual in FastqGeneralIterator(open(input)):
-                Total += 1
-                #look for barcode, trim it off
-                Barcode, BarcodeLabel = amptklib.AlignBarcode(seq, Barcodes, args.barcode_mismatch)
-                if Barcode == "":
-                    NoBarcode += 1
-                    continue
-                BarcodeLength = len(Barcode)
-                Seq = seq[BarcodeLength:]
-                Qual = qual[BarcodeLength:]
-                #now search for forward primer
-                foralign = edlib.align(FwdPrimer, Seq, mode="HW", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                if foralign["editDistance"] < 0:
-                    NoPrimer += 1
+    PrimerWindow = 0 #primer hits in the anchored window
+    PrimerFull = 0 #primer hits that needed the full read search
+    #find barcodes first, then search primers for the whole batch with one edlib call each
+    Found = []
+    for title, seq, qual in records:
+        Total += 1
+        #look for barcode, trim it off
+        Barcode, BarcodeLabel = BarcodeIndex.search(seq)
+        if Barcode == "":
+            NoBarcode += 1
+            continue
+        BarcodeLength = len(Barcode)
+        Found.append((BarcodeLabel, seq[BarcodeLength:], qual[BarcodeLength:]))
+    #now search for forward primer
+    Primed = []
+    for (BarcodeLabel, Seq, Qual), (foralign, hit) in itertools.izip(Found, amptklib.anchoredPrimers(FwdPrimer, [x[1] for x in Found], args.primer_mismatch)):
+        if hit == 'window':
+            PrimerWindow += 1
+        elif hit == 'full':
+            PrimerFull += 1
+        if foralign["editDistance"] < 0:
+            NoPrimer += 1
+            continue
+        Primed.append((BarcodeLabel, Seq, Qual, foralign["locations"][0][1]+1))
+    #now search for reverse primer
+    for (BarcodeLabel, Seq, Qual, ForTrim), (revalign, hit) in itertools.izip(Primed, amptklib.anchoredPrimers(RevPrimer, [x[1] for x in Primed], args.primer_mismatch, end=True)):
+        if hit == 'window':
+            PrimerWindow += 1
+        elif hit == 'full':
+            PrimerFull += 1
+        if revalign["editDistance"] >= 0:  #reverse primer was found
+            RevPrimerFound += 1 
+            #location to trim sequences
+            RevTrim = revalign["locations"][0][0]                
+            #determine reverse barcode
+            if args.reverse_barcode:
+                RevBCdiffs = 0
+                BCcut = revalign["locations"][0][1]
+                CutSeq = Seq[BCcut:]
+                RevBarcode, RevBarcodeLabel = RevBarcodeIndex.search(CutSeq)
+                if RevBarcode == "":
+                    NoRevBarcode += 1
                     continue
-                ForTrim = foralign["locations"][0][1]+1   
-                #now search for reverse primer
-                revalign = edlib.align(RevPrimer, Seq, mode="HW", task="locations", k=args.primer_mismatch, additionalEqualities=amptklib.degenNuc)
-                if revalign["editDistance"] >= 0:  #reverse primer was found
-                    RevPrimerFound += 1 
-                    #location to trim sequences
-                    RevTrim = revalign["locations"][0][0]                
-                    #determine reverse barcode
-                    if args.reverse_barcode:
-                        RevBCdiffs = 0
-                        BCcut = revalign["locations"][0][1]
-                        CutSeq = Seq[BCcut:]
-                        RevBarcode, RevBarcodeLabel = amptklib.AlignRevBarcode(CutSeq, RevBarcodes, args.barcode_mismatch)
-                        if RevBarcode == "":
-                            NoRevBarcode += 1
-                            continue
-                        BarcodeLabel = BarcodeLabel+'_'+RevBarcodeLabel                       
-                    #now trim record remove forward and reverse reads
-                    Seq = Seq[ForTrim:RevTrim]
-                    Qual = Qual[ForTrim:RevTrim]
-                    #since found reverse primer, now also need to pad/trim
-                    if not args.full_length:
-                        #check minimum length here or primer dimer type sequences will get padded with Ns
-                        if len(Seq) < int(args.min_len):
-                            TooShort += 1
-                            continue
-                        if len(Seq) < args.trim_len and args.pad == 'on':
-                            pad = args.trim_len - len(Seq)
-                            Seq = Seq + pad*'N'
-                            Qual = Qual +pad*'J'
-                        else: #len(Seq) > args.trim_len:
-                            Seq = Seq[:args.trim_len]
-                            Qual = Qual[:args.trim_len]
-                else:
-                    #trim record, did not find reverse primer
-                    if args.full_length: #if full length then move to next record
-                        continue
-                    #trim away forward primer
-                    Seq = Seq[ForTrim:]
-                    Qual = Qual[ForTrim:]
-                    #check length and trim, throw away if too short as it was bad read
-                    if len(Seq) < args.trim_len:
-                        TooShort += 1
-                        continue
-                    Seq = Seq[:args.trim_len]
-                    Qual = Qual[:args.trim_len]
-                #check minimum length
+                BarcodeLabel = BarcodeLabel+'_'+RevBarcodeLabel                       
+            #now trim record remove forward and reverse reads
+            Seq = Seq[ForTrim:RevTrim]
+            Qual = Qual[ForTrim:RevTrim]
+            #since found reverse primer, now also need to pad/trim
+            if not args.full_length:
+                #check minimum length here or primer dimer type sequences will get padded with Ns
                 if len(Seq) < int(args.min_len):
                     TooShort += 1
                     continue
-                ValidSeqs += 1
-                #rename header
-                Name = 'R_'+str(ValidSeqs)+';barcodelabel='+BarcodeLabel+';'
-                out.write("@%s\n%s\n+\n%s\n" % (Name, Seq, Qual))
-            counts.write('%i,%i,%i,%i,%i,%i,%i\n' % (Total, NoBarcode, NoPrimer, RevPrimerFound, NoRevBarcode, TooShort, ValidSeqs))        
+                if len(Seq) < args.trim_len and args.pad == 'on':
+                    pad = args.trim_len - len(Seq)
+                    Seq = Seq + pad*'N'
+                    Qual = Qual +pad*'J'
+                else: #len(Seq) > args.trim_len:
+                    Seq = Seq[:args.trim_len]
+                    Qual = Qual[:args.trim_len]
+        else:
+            #trim record, did not find reverse primer
+            if args.full_length: #if full length then move to next record
+                continue
+            #trim away forward primer
+            Seq = Seq[ForTrim:]
+            Qual = Qual[ForTrim:]
+            #check length and trim, throw away if too short as it was bad read
+            if len(Seq) < args.trim_len:
+                TooShort += 1
+                continue
+            Seq = Seq[:args.trim_len]
+            Qual = Qual[:args.trim_len]
+        #check minimum length
+        if len(Seq) < int(args.min_len):
+            TooShort += 1
+            continue
+        ValidSeqs += 1
+        Demuxed.append((BarcodeLabel, Seq, Qual))
+    return Demuxed, [Total, NoBarcode, NoPrimer, RevPrimerFound, NoRevBarcode, TooShort, ValidSeqs, PrimerWindow, PrimerFull]
 
     
 args.out = re.sub(r'\W+', '', args.out)
@@ -226,21 +236,16 @@ else:
         Adapter = ''
 
 
-#check if input is compressed
+#check if input is compressed, gzipped FASTQ is read as a stream so only other formats get uncompressed
 gzip_list = []
-if args.fastq.endswith('.gz'):
+if args.fastq.endswith('.gz') and args.fastq[:-3].endswith(('.sff', '.fas', '.fasta', '.fa', '.bam')):
     gzip_list.append(os.path.abspath(args.fastq))
-if args.reverse:
-    if args.reverse.endswith('.gz'):
-        gzip_list.append(os.path.abspath(args.reverse))
 if gzip_list:
     amptklib.log.info("Gzipped input files detected, uncompressing")
     for file in gzip_list:
         file_out = file.replace('.gz', '')
         amptklib.Funzip(file, file_out, cpus)
     args.fastq = args.fastq.replace('.gz', '')
-    if args.reverse:
-        args.reverse = args.reverse.replace('.gz', '')
      
 #if SFF file passed, convert to FASTQ with biopython
 if args.fastq.endswith(".sff"):
@@ -304,6 +309,7 @@ amptklib.log.info("Foward primer: %s,  Rev comp'd rev primer: %s" % (FwdPrimer,
 
 #then setup barcode dictionary
 Barcodes = fasta.ReadSeqsDict(barcode_file)
+BarcodeIndex = amptklib.BarcodeIndex(Barcodes, args.barcode_mismatch)
 
 #setup for looking for reverse barcode
 if args.reverse_barcode:
@@ -326,6 +332,7 @@ if args.reverse_barcode:
                 else:
                     amptklib.log.error("Duplicate reverse barcodes detected, exiting")
                     sys.exit(1)
+    RevBarcodeIndex = amptklib.BarcodeIndex(RevBarcodes, args.barcode_mismatch, mode='HW')
 #Count FASTQ records
 amptklib.log.info("Loading FASTQ Records")
 orig_total = amptklib.countfastq(SeqIn)
@@ -333,55 +340,11 @@ size = amptklib.checkfastqsize(SeqIn)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 
-#create tmpdir and split input into n cpus
-tmpdir = args.out.split('.')[0]+'_'+str(os.getpid())
-if not os.path.exists(tmpdir):
-    os.makedirs(tmpdir)
-
-#split fastq file
-amptklib.split_fastq(SeqIn, orig_total, tmpdir, cpus*2)    
-
-#now get file list from tmp folder
-file_list = []
-for file in os.listdir(tmpdir):
-    if file.endswith(".fq"):
-        file = os.path.join(tmpdir, file)
-        file_list.append(file)
-
-#finally process reads over number of cpus
-amptklib.runMultiProgress(processRead, file_list, cpus)
+#finally process reads over number of cpus, streaming batches straight to the compressed output
+FinalDemux = args.out + '.demux.fq.gz'
+finalstats, BarcodeCount = amptklib.demuxStream(SeqIn, processRead, FinalDemux, cpus, total=orig_total, workers=args.workers, store=args.store)
 
 print "-------------------------------------------------------"
-#Now concatenate all of the demuxed files together
-amptklib.log.info("Concatenating Demuxed Files")
-
-tmpDemux = args.out + '.tmp.demux.fq'
-with open(tmpDemux, 'wb') as outfile:
-    for filename in glob.glob(os.path.join(tmpdir,'*.demux.fq')):
-        if filename == tmpDemux:
-            continue
-        with open(filename, 'rU') as readfile:
-            shutil.copyfileobj(readfile, outfile)
-#parse the stats
-finalstats = [0,0,0,0,0,0,0]
-for file in os.listdir(tmpdir):
-    if file.endswith('.stats'):
-        with open(os.path.join(tmpdir, file), 'rU') as statsfile:
-            line = statsfile.readline()
-            line = line.replace('\n', '')
-            newstats = line.split(',')
-            newstats = [int(i) for i in newstats]
-            for x, num in enumerate(newstats):
-                finalstats[x] += num
-            
-#clean up tmp folder
-shutil.rmtree(tmpdir)
-
-#last thing is to re-number of reads as it is possible they could have same name from multitprocessor split
-catDemux = args.out + '.demux.fq'
-amptklib.fastqreindex(tmpDemux, catDemux)
-os.remove(tmpDemux)
-        
 amptklib.log.info('{0:,}'.format(finalstats[0])+' total reads')
 if args.reverse_barcode:
     amptklib.log.info('{0:,}'.format(finalstats[0]-finalstats[1]-finalstats[2]-finalstats[4])+' valid Fwd and Rev Barcodes')
@@ -390,17 +353,7 @@ else:
     amptklib.log.info('{0:,}'.format(finalstats[0]-finalstats[1]-finalstats[2])+' Fwd Primer found, {0:,}'.format(finalstats[3])+ ' Rev Primer found')
 amptklib.log.info('{0:,}'.format(finalstats[5])+' discarded too short (< %i bp)' % args.min_len)
 amptklib.log.info('{0:,}'.format(finalstats[6])+' valid output reads')
-#now loop through data and find barcoded samples, counting each.....
-BarcodeCount = {}
-with open(catDemux, 'rU') as input:
-    header = itertools.islice(input, 0, None, 4)
-    for line in header:
-        ID = line.split("=",1)[-1].split(";")[0]
-        if ID not in BarcodeCount:
-            BarcodeCount[ID] = 1
-        else:
-            BarcodeCount[ID] += 1
-
+amptklib.log.debug('Primer search: {0:,}'.format(finalstats[7])+' found in anchored window, {0:,}'.format(finalstats[8])+' needed full read search')
 #now let's count the barcodes found and count the number of times they are found.
 barcode_counts = "%22s:  %s" % ('Sample', 'Count')
 barcodes_found = []
@@ -415,10 +368,7 @@ if not args.mapping_file:
     genericmapfile = args.out + '.mapping_file.txt'
     amptklib.CreateGenericMappingFile(barcode_file, FwdPrimer, revcomp_lib.RevComp(RevPrimer), Adapter, genericmapfile, barcodes_found)
 
-#compress the output to save space
-FinalDemux = catDemux+'.gz'
-amptklib.Fzip(catDemux, FinalDemux, cpus)
-amptklib.removefile(catDemux)
+#clean up uncompressed input files
 if gzip_list:
     for file in gzip_list:
         file = file.replace('.gz', '')
@@ -428,6 +378,8 @@ if gzip_list:
 filesize = os.path.getsize(FinalDemux)
 readablesize = amptklib.convertSize(filesize)
 amptklib.log.info("Output file:  %s (%s)" % (FinalDemux, readablesize))
+if args.store:
+    amptklib.log.info("Read store:   %s" % amptklib.storeName(FinalDemux))
 amptklib.log.info("Mapping file: %s" % genericmapfile)
 
 print "-------------------------------------------------------"
@@ -9,6 +9,7 @@ currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfram
 parentdir = os.path.dirname(currentdir)
 sys.path.insert(0,parentdir)
 import lib.amptklib as amptklib
+import lib.uc2otutable as uc2otutable
 from natsort import natsorted
 
 #get script path for directory
@@ -39,6 +40,7 @@ parser.add_argument('-p','--pct_otu', default='97', help="Biological OTU Cluster
 parser.add_argument('--uchime_ref', help='Run UCHIME2 REF [ITS,16S,LSU,COI,custom]')
 parser.add_argument('--map_filtered', action='store_true', help='map quality filtered reads back to OTUs')
 parser.add_argument('--debug', action='store_true', help='Remove Intermediate Files')
+parser.add_argument('--cache', action='store_true', help='Use and store cached intermediate files (also on if $AMPTK_CACHE is set)')
 args=parser.parse_args()
 
 def checkfastqsize(input):
@@ -67,13 +69,12 @@ tmp = args.out + '_tmp'
 if not os.path.exists(tmp):
     os.makedirs(tmp)
 
-#Count FASTQ records
+#cache of the filtering/dereplication steps, keyed on input file contents and options
+cache = amptklib.StageCache(enabled=args.cache)
+
+#Count FASTQ records, from the demux index if there is one
 amptklib.log.info("Loading FASTQ Records")
-#convert to FASTA for mapping
-orig_fasta = os.path.join(tmp, args.out+'.orig.fa')
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastaout', orig_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-orig_total = amptklib.countfasta(orig_fasta)
+orig_total = amptklib.countfastq(args.FASTQ)
 size = amptklib.checkfastqsize(args.FASTQ)
 readablesize = amptklib.convertSize(size)
 amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
@@ -82,17 +83,23 @@ amptklib.log.info('{0:,}'.format(orig_total) + ' reads (' + readablesize + ')')
 filter_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fq')
 filter_fasta = os.path.join(tmp, args.out + '.EE' + args.maxee + '.filter.fa')
 amptklib.log.info("Quality Filtering, expected errors < %s" % args.maxee)
-cmd = ['vsearch', '--fastq_filter', args.FASTQ, '--fastq_maxee', str(args.maxee), '--fastqout', filter_out, '--fastaout', filter_fasta, '--fastq_qmax', '55']
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfastq(filter_out)
+filterkey = cache.key('filter', [args.FASTQ], [args.maxee])
+cached = cache.fetch(filterkey, [filter_out, filter_fasta])
+if cached is None:
+    cached = {'total': amptklib.EEFilter(args.FASTQ, filter_out, maxee=args.maxee, fasta=filter_fasta)[1]}
+    cache.store(filterkey, [filter_out, filter_fasta], cached)
+total = cached['total']
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
 #now run full length dereplication
 derep_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.derep.fa')
 amptklib.log.info("De-replication (remove duplicate reads)")
-cmd = ['vsearch', '--derep_fulllength', filter_out, '--relabel', 'Read_', '--sizeout', '--output', derep_out]
-amptklib.runSubprocess(cmd, amptklib.log)
-total = amptklib.countfasta(derep_out)
+derepkey = cache.key('derep', [filterkey], ['Read_'])
+cached = cache.fetch(derepkey, [derep_out])
+if cached is None:
+    cached = {'total': amptklib.dereplicate(filter_out, derep_out, relabel='Read_')[1]}
+    cache.store(derepkey, [derep_out], cached)
+total = cached['total']
 amptklib.log.info('{0:,}'.format(total) + ' reads passed')
 
 #now run de-noiser UNOISE2
@@ -140,59 +147,48 @@ iSeq_otu_table = args.out + '.otu_table.txt'
 if args.map_filtered:
     reads = filter_fasta
 else:
-    reads = orig_fasta
+    #the demux FASTQ is dereplicated as it is read, no FASTA copy needed
+    reads = args.FASTQ
 amptklib.log.info("Mapping Reads to iSeqs and Building OTU table")
-cmd = ['vsearch', '--usearch_global', reads, '--strand', 'plus', '--id', '0.97', '--db', iSeqs, '--uc', uc_iSeq_out, '--otutabout', iSeq_otu_table]
-amptklib.runSubprocess(cmd, amptklib.log)
+uniques = amptklib.mapUniques(reads, iSeqs, uc_iSeq_out)
+iSeqTable = uc2otutable.OTUTabOut(uc_iSeq_out, iSeq_otu_table, Uniques=uniques, DB=iSeqs)
 
 #count reads mapped
-total = amptklib.line_count2(uc_iSeq_out)
+total = iSeqTable.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to iSeqs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
-#now cluster to biological OTUs with UCLUST
+#now cluster to biological OTUs with UCLUST, the .uc says which OTU each iSeq went to
 radius = float(args.pct_otu) / 100.
 amptklib.log.info("Clustering denoised sequences into biological OTUs at %s%%" % args.pct_otu)
 uclust_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.uclust.fa')
-cmd = ['vsearch', '--cluster_smallmem', iSeqs, '--centroids', uclust_out, '--id', str(radius), '--strand', 'plus', '--relabel', 'OTU', '--qmask', 'none', '--usersort']
+iSeqmap = os.path.join(tmp, args.out + '.EE' + args.maxee + '.uclust.uc')
+cmd = ['vsearch', '--cluster_smallmem', iSeqs, '--centroids', uclust_out, '--uc', iSeqmap, '--id', str(radius), '--strand', 'plus', '--relabel', 'OTU', '--qmask', 'none', '--usersort']
 amptklib.runSubprocess(cmd, amptklib.log)
 total = amptklib.countfasta(uclust_out)
 amptklib.log.info('{0:,}'.format(total) + ' OTUs generated')
 
 #determine where denoised sequences clustered
 ClusterComp = args.out+'.iSeqs2clusters.txt'
-iSeqmap = args.out+'.unoise_map.uc'
-cmd = [usearch, '-usearch_global', iSeqs, '-db', uclust_out, '-id', str(radius), '-uc', iSeqmap, '-strand', 'plus']
-amptklib.runSubprocess(cmd, amptklib.log)
+iSeq2OTU = uc2otutable.ClusterMap(iSeqmap)
 iSeqMapped = {}
-with open(iSeqmap, 'rU') as mapping:
-    for line in mapping:
-        line = line.replace('\n', '')
-        cols = line.split('\t')
-        OTU = cols[9]
-        Hit = cols[8]
-        if not OTU in iSeqMapped:
-            iSeqMapped[OTU] = [Hit]
-        else:
-            iSeqMapped[OTU].append(Hit)
+for Hit in natsorted(iSeq2OTU):
+    OTU = iSeq2OTU[Hit]
+    if not OTU in iSeqMapped:
+        iSeqMapped[OTU] = [Hit]
+    else:
+        iSeqMapped[OTU].append(Hit)
 with open(ClusterComp, 'w') as clusters:
     clusters.write('OTU\tiSeqs\n')
     for k,v in natsorted(iSeqMapped.items()):
         clusters.write('%s\t%s\n' % (k, ', '.join(v)))
 
-#now map reads back to OTUs and build OTU table
-uc_out = os.path.join(tmp, args.out + '.EE' + args.maxee + '.cluster.mapping.uc')
+#build the OTU table from the reads to iSeqs mapping, reads are counted for the OTU their iSeq clustered into
 otu_table = os.path.join(tmp, args.out + '.EE' + args.maxee + '.cluster.otu_table.txt')
-#setup reads to map
-if args.map_filtered:
-    reads = filter_fasta
-else:
-    reads = orig_fasta
-amptklib.log.info("Mapping Reads to OTUs and Building OTU table")
-cmd = ['vsearch', '--usearch_global', reads, '--strand', 'plus', '--id', '0.97', '--db', uclust_out, '--uc', uc_out, '--otutabout', otu_table]
-amptklib.runSubprocess(cmd, amptklib.log)
+amptklib.log.info("Building OTU table from iSeq mapping")
+table = uc2otutable.OTUTabOut(uc_iSeq_out, otu_table, Targets=iSeq2OTU, Uniques=uniques, DB=uclust_out)
 
 #count reads mapped
-total = amptklib.line_count2(uc_out)
+total = table.Total()
 amptklib.log.info('{0:,}'.format(total) + ' reads mapped to OTUs '+ '({0:.0f}%)'.format(total/float(orig_total)* 100))
 
 #Move files around, delete tmp if argument passed.
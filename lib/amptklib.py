@@ -1,4 +1,4 @@
-import sys, logging, csv, os, subprocess, multiprocessing, platform, time, shutil, inspect, gzip, edlib
+import sys, logging, csv, os, subprocess, multiprocessing, platform, time, shutil, inspect, gzip, collections, itertools, zlib, threading, Queue, traceback, struct, array, binascii, string, re, signal, edlib
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parentdir = os.path.dirname(currentdir)
 from Bio import SeqIO
@@ -174,6 +174,254 @@ class gzopen(object):
    def next(self):
       return next(self.f)
       
+class StageCache(object):
+    '''
+    cache of intermediate pipeline files (filter.fq, derep.fa, etc) so re-runs on the same
+    input with different clustering options can skip them.  Entries are keyed on the
+    content hash of the input files, the stage parameters and the tool version.  Files are
+    hard linked in and out of the cache folder (copied if that fails), least recently used
+    entries are evicted once the cache is larger than maxbytes.  Caching is off unless asked
+    for (--cache) or $AMPTK_CACHE is set.  Location and size can be set with $AMPTK_CACHE and
+    $AMPTK_CACHE_SIZE (GB), default ~/.amptk_cache and 20 GB.
+    '''
+    def __init__(self, enabled=False, folder=None, maxbytes=None):
+        self.enabled = enabled or 'AMPTK_CACHE' in os.environ
+        if not folder:
+            folder = os.environ.get('AMPTK_CACHE', os.path.join(os.path.expanduser('~'), '.amptk_cache'))
+        if not maxbytes:
+            maxbytes = float(os.environ.get('AMPTK_CACHE_SIZE', 20)) * 1e9
+        self.folder = folder
+        self.maxbytes = maxbytes
+        self.version = None
+        if self.enabled:
+            try:
+                if not os.path.isdir(self.folder):
+                    os.makedirs(self.folder)
+            except OSError:
+                log.debug("Could not create cache folder %s, caching turned off" % self.folder)
+                self.enabled = False
+
+    def hashfile(self, input):
+        #hashing is one read of the file, remember it by path, size and modification time
+        import hashlib, json
+        stat = os.stat(input)
+        path = os.path.abspath(input)
+        hashes = {}
+        hashfile = os.path.join(self.folder, 'hashes.json')
+        if os.path.isfile(hashfile):
+            try:
+                with open(hashfile, 'rU') as f:
+                    hashes = json.load(f)
+            except ValueError:
+                hashes = {}
+        stored = hashes.get(path)
+        if stored and stored[0] == stat.st_size and stored[1] == stat.st_mtime:
+            return stored[2]
+        sha = hashlib.sha1()
+        with open(input, 'rb') as f:
+            for block in iter(lambda: f.read(1048576), b''):
+                sha.update(block)
+        hashes[path] = [stat.st_size, stat.st_mtime, sha.hexdigest()]
+        #other runs may be reading it, so write a copy and rename it into place
+        tmphashfile = hashfile + '.tmp' + str(os.getpid())
+        with open(tmphashfile, 'w') as f:
+            json.dump(hashes, f)
+        os.rename(tmphashfile, hashfile)
+        return sha.hexdigest()
+
+    def key(self, stage, inputs, params):
+        '''
+        inputs is a list of files or keys of earlier stages, params is a list of anything
+        else the output depends on, amptk version is always added
+        '''
+        import hashlib
+        if not self.enabled:
+            return None
+        if not self.version:
+            self.version = get_version()
+        parts = [stage, self.version]
+        for x in inputs:
+            if os.path.isfile(x):
+                parts.append(self.hashfile(x))
+            else:
+                parts.append(str(x))
+        parts += [str(x) for x in params]
+        return stage + '_' + hashlib.sha1('\t'.join(parts)).hexdigest()
+
+    def place(self, src, dest):
+        if os.path.isfile(dest):
+            os.remove(dest)
+        try:
+            os.link(src, dest)
+        except (OSError, AttributeError):
+            shutil.copyfile(src, dest)
+
+    def fetch(self, key, outputs):
+        '''
+        put cached files in place for outputs, returns the info dictionary stored with them or
+        None on a miss.  On a miss any existing outputs are removed, since they may be linked
+        to the cache and so must not be overwritten in place
+        '''
+        import json
+        for x in outputs:
+            removefile(x)
+        if not self.enabled or not key:
+            return None
+        entry = os.path.join(self.folder, key)
+        infofile = os.path.join(entry, 'info.json')
+        if not os.path.isfile(infofile):
+            return None
+        #files are stored by position, so the output names can change between runs
+        for i in range(len(outputs)):
+            if not os.path.isfile(os.path.join(entry, str(i))):
+                return None
+        for i, x in enumerate(outputs):
+            self.place(os.path.join(entry, str(i)), x)
+        #touch to mark as recently used
+        os.utime(infofile, None)
+        with open(infofile, 'rU') as f:
+            info = json.load(f)
+        log.debug("Using cached %s: %s" % (key.split('_')[0], ', '.join(outputs)))
+        return info
+
+    def store(self, key, outputs, info={}):
+        import json
+        if not self.enabled or not key:
+            return
+        entry = os.path.join(self.folder, key)
+        tmpentry = entry + '.tmp' + str(os.getpid())
+        if os.path.isdir(tmpentry):
+            shutil.rmtree(tmpentry)
+        os.makedirs(tmpentry)
+        for i, x in enumerate(outputs):
+            self.place(x, os.path.join(tmpentry, str(i)))
+        with open(os.path.join(tmpentry, 'info.json'), 'w') as f:
+            json.dump(info, f)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.rename(tmpentry, entry)
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        entries = []
+        total = 0
+        for x in os.listdir(self.folder):
+            infofile = os.path.join(self.folder, x, 'info.json')
+            if not os.path.isfile(infofile):
+                continue
+            size = sum(getSize(os.path.join(self.folder, x, y)) for y in os.listdir(os.path.join(self.folder, x)))
+            entries.append((os.path.getmtime(infofile), x, size))
+            total += size
+        for mtime, x, size in sorted(entries):
+            if total <= self.maxbytes:
+                break
+            if x == keep:
+                continue
+            log.debug("Removing %s from cache" % x)
+            shutil.rmtree(os.path.join(self.folder, x))
+            total -= size
+
+def zipCommand(cpus, decompress=False):
+    '''
+    return command to (de)compress stdin to stdout, pigz -> bgzip -> gzip, None if none are installed
+    '''
+    global zipTool
+    if zipTool is None:
+        zipTool = False
+        for tool in ['pigz', 'bgzip', 'gzip']:
+            if any(os.access(os.path.join(x, tool), os.X_OK) for x in os.environ.get('PATH', '').split(os.pathsep)):
+                zipTool = tool
+                break
+    if zipTool == 'pigz':
+        cmd = ['pigz', '-c', '-p', str(cpus)]
+    elif zipTool == 'bgzip':
+        cmd = ['bgzip', '-c', '-@', str(cpus)]
+    elif zipTool == 'gzip':
+        cmd = ['gzip', '-c']
+    else:
+        return None
+    if decompress:
+        cmd.append('-d')
+    return cmd
+
+zipTool = None
+
+class zopen(object):
+    '''
+    streaming open for plain or gzipped files, mode is 'r' or 'w'.  Gzipped files are piped
+    through pigz -> bgzip -> gzip, so the uncompressed data never goes to disk and the
+    (de)compression runs alongside python, falls back to the gzip module if none are installed.
+    On read compression is detected by magic number, on write by the .gz extension.
+    '''
+    def __init__(self, fname, mode='r', cpus=None):
+        if not cpus:
+            cpus = multiprocessing.cpu_count()
+        self.fname = fname
+        self.mode = mode
+        self.proc = None
+        self.out = None
+        if mode.startswith('r'):
+            with open(fname, 'rb') as f:
+                compressed = f.read(2) == '\x1f\x8b'
+            cmd = zipCommand(cpus, decompress=True)
+            if not compressed:
+                self.f = open(fname, 'rU')
+            elif cmd:
+                #python ignores SIGPIPE, reset it so a reader that stops early just ends the decompressor
+                self.proc = subprocess.Popen(cmd + [fname], stdout=subprocess.PIPE, bufsize=1048576,
+                                             preexec_fn=lambda: signal.signal(signal.SIGPIPE, signal.SIG_DFL))
+                self.f = self.proc.stdout
+            else:
+                self.f = gzip.open(fname, 'rb')
+        else:
+            cmd = zipCommand(cpus)
+            if not fname.endswith('.gz'):
+                self.f = open(fname, 'w')
+            elif cmd:
+                self.out = open(fname, 'wb')
+                self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=self.out, bufsize=1048576)
+                self.f = self.proc.stdin
+            else:
+                self.f = gzip.open(fname, 'wb')
+
+    def close(self):
+        self.f.close()
+        if self.proc:
+            if self.mode.startswith('r'):
+                #reader may stop early, which kills the decompressor with SIGPIPE, that can only
+                #happen before the end of the data, any other failure means a truncated/corrupt file
+                ret = self.proc.wait()
+                if ret != 0 and ret != -signal.SIGPIPE:
+                    raise IOError("decompressing %s failed (exit status %i)" % (self.fname, ret))
+            else:
+                ret = self.proc.wait()
+                self.out.close()
+                if ret != 0:
+                    raise IOError("compressing %s failed (exit status %i)" % (self.fname, ret))
+
+    def __enter__(self):
+        return self
+    def __exit__(self, type, value, traceback):
+        self.close()
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+    def __iter__(self):
+        return iter(self.f)
+    def next(self):
+        return next(self.f)
+
+class lineReader(object):
+    '''
+    readline() over an iterator of lines, for parsers that call readline (FastqGeneralIterator)
+    on a stream whose first line was already read, e.g. itertools.chain([first], zopen(input))
+    '''
+    def __init__(self, lines):
+        self.lines = iter(lines)
+    def readline(self):
+        return next(self.lines, '')
+    def __iter__(self):
+        return self.lines
+
 def Funzip(input, output, cpus):
     '''
     function to unzip as fast as it can, pigz -> bgzip -> gzip
@@ -243,7 +491,304 @@ def GuessRL(input):
             break
     return myround(max(set(lengths)))
 
+def sidecarName(input):
+    return input + '.count.json'
+
+def fileChecksum(input, window=1048576):
+    #crc32 of the first and last window bytes of the file on disk, so the cost does not grow with the file
+    with open(input, 'rb') as f:
+        crc = zlib.crc32(f.read(window))
+        f.seek(0, 2)
+        if f.tell() > window:
+            f.seek(max(f.tell() - window, window))
+            crc = zlib.crc32(f.read(window), crc)
+    return '%08x' % (crc & 0xffffffff)
+
+def writeSidecar(input, records, bases=None, samples=None, lengths=None):
+    '''
+    write a small json sidecar next to input holding records, bases, bytes, mtime and a
+    checksum of the start and end of the file, so later steps can get the read count
+    without rescanning the file, demux files also get reads per sample and a read length
+    histogram.  Only for files the pipeline writes itself, never next to user input.
+    '''
+    import json
+    stat = os.stat(input)
+    info = {'records': records, 'bases': bases, 'bytes': stat.st_size, 'mtime': stat.st_mtime, 'checksum': fileChecksum(input)}
+    if samples is not None:
+        info['samples'] = samples
+        info['lengths'] = lengths
+    try:
+        with open(sidecarName(input), 'w') as f:
+            json.dump(info, f)
+    except IOError:
+        pass
+
+def readSidecar(input):
+    '''
+    return the sidecar dictionary for input, None if there isn't one or if the file
+    has changed (size, modification time or checksum) since it was written
+    '''
+    import json
+    sidecar = sidecarName(input)
+    if not os.path.isfile(sidecar) or not os.path.isfile(input):
+        return None
+    try:
+        with open(sidecar, 'rU') as f:
+            info = json.load(f)
+    except ValueError:
+        return None
+    stat = os.stat(input)
+    if info.get('bytes') != stat.st_size or info.get('mtime') != stat.st_mtime:
+        return None
+    #same size and mtime can still be an edit within the same second, fileChecksum only
+    #reads the two ends of the file so this stays cheap for any size
+    if info.get('checksum') != fileChecksum(input):
+        return None
+    return info
+
+class SeqWriter(object):
+    '''
+    write FASTQ or FASTA records (gzipped if output ends with .gz) while keeping count
+    of records and bases, sidecar is written on close.
+    with samples=True reads per sample and read lengths are counted too (see sampleIndex)
+    '''
+    def __init__(self, output, samples=False):
+        self.output = output
+        self.f = zopen(output, 'w')
+        self.records = 0
+        self.bases = 0
+        self.samples = {} if samples else None
+        self.lengths = {} if samples else None
+
+    def write(self, data):
+        self.f.write(data)
+
+    def fastq(self, title, seq, qual, sample=None):
+        self.records += 1
+        self.bases += len(seq)
+        if self.samples is not None:
+            if not sample:
+                sample = getSampleLabel(title)
+            self.samples[sample] = self.samples.get(sample, 0) + 1
+            self.lengths[len(seq)] = self.lengths.get(len(seq), 0) + 1
+        self.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+
+    def fasta(self, title, seq):
+        self.records += 1
+        self.bases += len(seq)
+        self.write(">%s\n%s\n" % (title, seq))
+
+    def close(self):
+        self.f.close()
+        writeSidecar(self.output, self.records, self.bases,
+                     samples=self.samples, lengths=self.lengths)
+
+    def __enter__(self):
+        return self
+    def __exit__(self, type, value, traceback):
+        if type:
+            self.f.close()
+        else:
+            self.close()
+
+def getSampleLabel(title):
+    #sample name from a demux read header, i.e. R_1;barcodelabel=sample;
+    if 'barcodelabel=' in title:
+        return title.split('barcodelabel=', 1)[1].split(';')[0]
+    return title.split('=')[-1].split(';')[0]
+
+def sampleIndex(input):
+    '''
+    return ({sample: reads}, {read length: reads}) for a demux FASTQ file.  Comes from the
+    sidecar written by the demux scripts if it is current (checking it reads at most 2 MB
+    of the file, see fileChecksum), else from the DemuxStore footer, else the file is read
+    once (nothing is written next to it)
+    '''
+    info = readSidecar(input)
+    if info and info.get('samples') is not None:
+        samples = dict((str(k), v) for k, v in info['samples'].items())
+        lengths = dict((int(k), v) for k, v in info['lengths'].items())
+        return samples, lengths
+    store = openStore(input)
+    if store:
+        with store:
+            if store.lengths is not None:
+                return dict(store.counts), store.lengths
+    samples = {}
+    lengths = {}
+    with zopen(input) as f:
+        for i, line in enumerate(f):
+            if i % 4 == 0:
+                sample = getSampleLabel(line[1:].rstrip())
+                samples[sample] = samples.get(sample, 0) + 1
+            elif i % 4 == 1:
+                length = len(line.rstrip())
+                lengths[length] = lengths.get(length, 0) + 1
+    return samples, lengths
+
+def storeName(input):
+    return input + '.store'
+
+PackBases = string.maketrans('ACGT', '0123')
+UnpackBases = [''.join(x) for x in itertools.product('ACGT', repeat=4)]
+
+class DemuxStoreWriter(object):
+    '''
+    binary copy of a demux FASTQ: each record is a small header (sample id, title length,
+    read length, number of non-ACGT runs), the title, the non-ACGT runs, the sequence packed
+    2 bits per base and the quality bytes.  On close a per-sample index of record offsets
+    is written at the end, along with the size/mtime of the FASTQ it belongs to
+    '''
+    Magic = 'AMPTKDS1'
+    Record = struct.Struct('<HHIH')
+    Run = struct.Struct('<IHc')
+
+    def __init__(self, output):
+        self.output = output
+        self.f = open(output + '.tmp', 'wb')
+        self.f.write(self.Magic)
+        self.pos = len(self.Magic)
+        self.samples = {}
+        self.names = []
+        self.offsets = []
+        self.bases = 0
+        self.lengths = {}
+
+    def add(self, title, seq, qual, sample=None):
+        if sample is None:
+            sample = getSampleLabel(title)
+        if sample not in self.samples:
+            self.samples[sample] = len(self.names)
+            self.names.append(sample)
+            self.offsets.append(array.array('L'))
+        idx = self.samples[sample]
+        runs = [(m.start(), len(m.group()), m.group()[0]) for m in re.finditer(r'([^ACGT])\1*', seq)] if seq.translate(None, 'ACGT') else []
+        codes = seq.translate(PackBases)
+        if runs:
+            codes = re.sub('[^0-3]', '0', codes)
+        codes += '0' * (-len(codes) % 4)
+        packed = binascii.unhexlify('%0*x' % (len(codes) // 2, int(codes, 4))) if codes else ''
+        data = self.Record.pack(idx, len(title), len(seq), len(runs)) + title + ''.join([self.Run.pack(*x) for x in runs]) + packed + qual
+        self.offsets[idx].append(self.pos)
+        self.f.write(data)
+        self.pos += len(data)
+        self.bases += len(seq)
+        self.lengths[len(seq)] = self.lengths.get(len(seq), 0) + 1
+
+    def close(self, fastq=None):
+        '''
+        write the index and footer, fastq is the demux file this store is a copy of
+        '''
+        import json, numpy as np
+        info = {'samples': self.names, 'counts': [len(x) for x in self.offsets], 'bases': self.bases, 'lengths': self.lengths, 'index': self.pos}
+        if fastq:
+            stat = os.stat(fastq)
+            info['fastq'] = {'bytes': stat.st_size, 'mtime': stat.st_mtime}
+        for x in self.offsets:
+            self.f.write(np.array(x, dtype='<u8').tostring())
+        footer = json.dumps(info)
+        self.f.write(footer)
+        self.f.write(struct.pack('<Q', len(footer)) + self.Magic)
+        self.f.close()
+        os.rename(self.output + '.tmp', self.output)
+
+class DemuxStore(object):
+    '''
+    reader for DemuxStoreWriter files, reads of one or more samples are found by seeking to
+    their offsets so selecting, counting and sub-sampling don't scan the whole file
+    '''
+    def __init__(self, input):
+        import json, numpy as np
+        self.input = input
+        self.f = open(input, 'rb')
+        self.f.seek(-16, 2)
+        end = self.f.tell()
+        length, magic = struct.unpack('<Q8s', self.f.read(16))
+        if magic != DemuxStoreWriter.Magic:
+            raise ValueError('%s is not an AMPtk demux store' % input)
+        self.f.seek(end - length)
+        self.info = json.loads(self.f.read(length))
+        self.samples = [str(x) for x in self.info['samples']]
+        self.counts = dict(zip(self.samples, self.info['counts']))
+        #read length histogram, not in stores written before it was added
+        self.lengths = None
+        if 'lengths' in self.info:
+            self.lengths = dict((int(k), v) for k, v in self.info['lengths'].items())
+        self.offsets = {}
+        self.f.seek(self.info['index'])
+        for name, count in zip(self.samples, self.info['counts']):
+            self.offsets[name] = np.frombuffer(self.f.read(8 * count), dtype='<u8')
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def read(self, offset):
+        #return (title, seq, qual) of the record at offset
+        f = self.f
+        f.seek(offset)
+        idx, tlen, slen, nruns = DemuxStoreWriter.Record.unpack(f.read(DemuxStoreWriter.Record.size))
+        title = f.read(tlen)
+        runs = [DemuxStoreWriter.Run.unpack(f.read(DemuxStoreWriter.Run.size)) for i in range(nruns)]
+        packed = f.read((slen + 3) // 4)
+        seq = ''.join([UnpackBases[x] for x in bytearray(packed)])[:slen]
+        for start, length, char in runs:
+            seq = seq[:start] + char * length + seq[start+length:]
+        qual = f.read(slen)
+        return title, seq, qual
+
+    def records(self, samples=None, offsets=None):
+        '''
+        yield (title, seq, qual) for the reads of samples (default all) in file order, or for
+        a list of offsets, e.g. a random subset of self.offsets[sample]
+        '''
+        import numpy as np
+        if offsets is None:
+            if samples is None:
+                samples = self.samples
+            selected = [self.offsets[x] for x in samples if x in self.offsets]
+            offsets = np.concatenate(selected) if selected else []
+        for offset in np.sort(offsets):
+            yield self.read(int(offset))
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+def openStore(input):
+    '''
+    return a DemuxStore for the demux FASTQ input if it has one that is up to date, else None
+    '''
+    store = storeName(input)
+    if not os.path.isfile(store) or not os.path.isfile(input):
+        return None
+    try:
+        reader = DemuxStore(store)
+    except (ValueError, IOError, struct.error):
+        return None
+    stat = os.stat(input)
+    fastq = reader.info.get('fastq')
+    if not fastq or fastq.get('bytes') != stat.st_size or fastq.get('mtime') != stat.st_mtime:
+        reader.close()
+        return None
+    return reader
+
+def buildStore(input):
+    #write the DemuxStore for an existing demux FASTQ file
+    out = DemuxStoreWriter(storeName(input))
+    with zopen(input) as infile:
+        for title, seq, qual in FastqGeneralIterator(infile):
+            out.add(title, seq, qual)
+    out.close(fastq=input)
+
 def countfasta(input):
+    #count from the sidecar of files written by SeqWriter, others are counted but left alone
+    info = readSidecar(input)
+    if info:
+        return info['records']
     count = 0
     with open(input, 'rU') as f:
         for line in f:
@@ -252,7 +797,11 @@ def countfasta(input):
     return count
     
 def countfastq(input):
-    lines = sum(1 for line in gzopen(input))
+    info = readSidecar(input)
+    if info:
+        return info['records']
+    with zopen(input) as f:
+        lines = sum(1 for line in f)
     count = int(lines) / 4
     return count
 
@@ -321,74 +870,204 @@ def bam2fastq(input, output):
             for title, seq, qual in pybam.read(bamin,['sam_qname', 'sam_seq','sam_qual']):
                 fastqout.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
 
-def scan_linepos(path):
-    """return a list of seek offsets of the beginning of each line"""
-    linepos = []
-    offset = 0
-    with gzopen(path) as inf:     
-        # WARNING: CPython 2.7 file.tell() is not accurate on file.next()
-        for line in inf:
-            linepos.append(offset)
-            offset += len(line)
-    return linepos
-
-def return_lines(path, linepos, nstart, nstop):
-    """return nsamp lines from path where line offsets are in linepos"""
-    offsets = linepos[nstart:nstop]
-    lines = []
-    with gzopen(path) as inf:
-        for offset in offsets:
-            inf.seek(offset)
-            lines.append(inf.readline())
-    return lines     
+def split_fastq_ranges(input, chunks):
+    '''
+    split a FASTQ file into approximately equal byte ranges, each range start is
+    moved forward to the next FASTQ header so no line positions need to be stored
+    returns a list of (start, end) byte offsets
+    '''
+    size = getSize(input)
+    starts = [0]
+    with open(input, 'rb') as infile:
+        for i in range(1, chunks):
+            infile.seek(size * i / chunks)
+            infile.readline() #partial line
+            lines = [infile.readline() for x in range(3)]
+            offset = infile.tell() - sum(len(x) for x in lines)
+            #resync, quality lines can start with '@' so check the line after next is '+'
+            while lines[0] and not (lines[0].startswith('@') and lines[2].startswith('+')):
+                offset += len(lines[0])
+                lines = lines[1:] + [infile.readline()]
+            if lines[0] and offset > starts[-1]:
+                starts.append(offset)
+    return zip(starts, starts[1:] + [size])
+
+def read_fastq_range(input, start, end):
+    '''
+    iterate over the FASTQ records in a byte range from split_fastq_ranges
+    yields (title, seq, qual) like FastqGeneralIterator
+    '''
+    with open(input, 'rb') as infile:
+        infile.seek(start)
+        while infile.tell() < end:
+            title = infile.readline()
+            if not title:
+                break
+            seq = infile.readline()
+            infile.readline()
+            qual = infile.readline()
+            yield title[1:].rstrip(), seq.rstrip(), qual.rstrip()
 
 def split_fastq(input, numseqs, outputdir, chunks):
-    #get number of sequences and then number of sequences in each chunk
-    numlines = numseqs*4
-    n = numlines / chunks
-    #make sure n is divisible by 4 (number of lines in fastq)
-    if ( n % 4 ) != 0:
-        n = ((n / 4) + 1) * 4
-    splits = []
-    count = 0
-    for i in range(chunks):
-        start = count
-        end = count+n
-        if end > numlines:
-            end = numlines
-        splits.append((start, end))
-        count += n
-    #get line positions from file
-    linepos = scan_linepos(input)
     #make sure output directory exists
     if not os.path.isdir(outputdir):
         os.makedirs(outputdir)
-    #loop through the positions and write output
-    for i, x in enumerate(splits):
-        num = i+1
-        with open(os.path.join(outputdir, 'chunk_'+str(num)+'.fq'), 'w') as output:
-            lines = return_lines(input, linepos, x[0], x[1])
-            output.write('%s' % ''.join(lines))
-
-def trim3prime(input, trimlen, output, removelist):
-    with open(output, 'w') as outfile:
-        for title, seq, qual in FastqGeneralIterator(gzopen(input)):
-            if not title.split(' ')[0] in removelist:
-                Seq = seq[:trimlen]
-                Qual = qual[:trimlen]
-                outfile.write("@%s\n%s\n+\n%s\n" % (title, Seq, Qual))
-
-def PEsanitycheck(R1, R2):
-    R1count = line_count(R1)
-    R2count = line_count(R2)
-    if R1count != R2count:
-        return False
+    if input.endswith('.gz'):
+        #can't seek in compressed files, so stream records sequentially into the chunks
+        if not numseqs:
+            numseqs = countfastq(input)
+        n = numseqs / chunks + 1
+        with zopen(input) as infile:
+            for i, batch in enumerate(batch_iterator(FastqGeneralIterator(infile), n)):
+                with open(os.path.join(outputdir, 'chunk_'+str(i+1)+'.fq'), 'w') as output:
+                    for title, seq, qual in batch:
+                        output.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+        return
+    #otherwise copy each byte range out to a chunk file
+    with open(input, 'rb') as infile:
+        for i, x in enumerate(split_fastq_ranges(input, chunks)):
+            infile.seek(x[0])
+            remaining = x[1] - x[0]
+            with open(os.path.join(outputdir, 'chunk_'+str(i+1)+'.fq'), 'wb') as output:
+                while remaining > 0:
+                    block = infile.read(min(remaining, 1048576))
+                    if not block:
+                        break
+                    output.write(block)
+                    remaining -= len(block)
+
+def pairID(title):
+    #read name without the /1 /2 mate suffix used by older Illumina headers
+    ID = title.split(' ')[0]
+    if ID.endswith(('/1', '/2')):
+        ID = ID[:-2]
+    return ID
+
+def openFIFO(fname, proc):
+    #opening a FIFO blocks until it has a reader, so poll in case proc dies before opening it
+    import fcntl
+    while True:
+        try:
+            fd = os.open(fname, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != os.errno.ENXIO:
+                raise
+            if proc.poll() is not None:
+                raise IOError("process exited before reading %s" % fname)
+            time.sleep(0.05)
+            continue
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_NONBLOCK)
+        return os.fdopen(fd, 'w')
+
+class FIFOWriter(object):
+    '''
+    file-like writer for a FIFO that is read by proc.  Data is written from a background
+    thread through a bounded queue, so a reader that pulls R1 and R2 at different rates
+    cannot deadlock the lock-step writer.  Errors are kept in self.error
+    '''
+    def __init__(self, fname, proc, batchsize=1000, maxsize=100):
+        self.fname = fname
+        self.proc = proc
+        self.batchsize = batchsize
+        self.buffer = []
+        self.error = None
+        self.queue = Queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        try:
+            out = openFIFO(self.fname, self.proc)
+        except (IOError, OSError) as e:
+            self.error = e
+            out = None
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if out is None: #keep draining so the producer never blocks
+                continue
+            try:
+                out.write(data)
+            except IOError as e:
+                self.error = e
+                out = None
+        if out is not None:
+            try:
+                out.close()
+            except IOError as e:
+                self.error = e
+
+    def write(self, data):
+        self.buffer.append(data)
+        if len(self.buffer) >= self.batchsize:
+            self.queue.put(''.join(self.buffer))
+            self.buffer = []
+
+    def close(self):
+        #does not wait for the thread, the reader may still need data from the other mate
+        if self.buffer:
+            self.queue.put(''.join(self.buffer))
+            self.buffer = []
+        self.queue.put(None)
+
+    def join(self):
+        self.thread.join()
+
+def iterPairs(R1, R2):
+    #lock-step iterator over R1 and R2, raises ValueError if they are not properly paired
+    count = 0
+    with zopen(R1) as f1:
+        with zopen(R2) as f2:
+            for r1, r2 in itertools.izip_longest(FastqGeneralIterator(f1), FastqGeneralIterator(f2)):
+                if r1 is None or r2 is None:
+                    raise ValueError("%s and %s do not have the same number of reads" % (R1, R2))
+                count += 1
+                if pairID(r1[0]) != pairID(r2[0]):
+                    raise ValueError("%s and %s are out of order at read %i (%s, %s)" % (R1, R2, count, pairID(r1[0]), pairID(r2[0])))
+                yield r1, r2
+
+def indexMismatch(r1, r2, index):
+    return r1[0].split(':')[-1] != index or r2[0].split(':')[-1] != index
+
+def pairedTrim(R1, R2, trimlen, out1, out2, index=None, proc=None):
+    '''
+    single lock-step pass over R1 and R2: drops pairs where the index in either header
+    differs from index, trims both mates to trimlen and checks the reads are paired.
+    If proc is given out1/out2 are FIFOs being read by proc.  Returns (total, removed),
+    raises ValueError if R1 and R2 are not properly paired and IOError if writing to
+    proc failed (e.g. it exited early)
+    '''
+    if proc:
+        writers = [FIFOWriter(out1, proc), FIFOWriter(out2, proc)]
     else:
-        return True
+        writers = [open(out1, 'w'), open(out2, 'w')]
+    total = 0
+    removed = 0
+    try:
+        for r1, r2 in iterPairs(R1, R2):
+            total += 1
+            if index and indexMismatch(r1, r2, index):
+                removed += 1
+                continue
+            writers[0].write("@%s\n%s\n+\n%s\n" % (r1[0], r1[1][:trimlen], r1[2][:trimlen]))
+            writers[1].write("@%s\n%s\n+\n%s\n" % (r2[0], r2[1][:trimlen], r2[2][:trimlen]))
+    finally:
+        for w in writers:
+            w.close()
+        if proc:
+            for w in writers:
+                w.join()
+    if proc:
+        for w in writers:
+            if w.error:
+                raise IOError("writing %s failed: %s" % (w.fname, w.error))
+    return total, removed
 
 def checkBCinHeader(input):
     #read first header
-    for title, seq, qual in FastqGeneralIterator(open(input)):
+    for title, seq, qual in FastqGeneralIterator(gzopen(input)):
         header = title.split(' ')
         info = header[-1]
         if info.split(':')[-1].isdigit():
@@ -397,17 +1076,6 @@ def checkBCinHeader(input):
             return True
         break
 
-def illuminaBCmismatch(R1, R2, index):
-    remove = []
-    for file in [R1,R2]:
-        for title, seq, qual in FastqGeneralIterator(open(file)):
-            ID = title.split(' ')[0]
-            BC = title.split(':')[-1]
-            if BC != index:
-                remove.append(ID)
-    remove = set(remove)
-    return remove
-
 def AlignBarcode(Seq, BarcodeDict, mismatch):
     besthit = ('', '', '')
     for BL in BarcodeDict.keys():
@@ -438,86 +1106,533 @@ def AlignRevBarcode(Seq, BarcodeDict, mismatch):
         return besthit[0], besthit[1]
     return "", ""
 
+class BarcodeIndex(object):
+    '''
+    barcode lookup built once per run, gives the same hits as AlignBarcode (mode='SHW')
+    or AlignRevBarcode (mode='HW') without aligning every barcode to every read.  All
+    sequences within mismatch edits of each barcode are stored in a dictionary, so a read
+    is matched by looking up its prefixes (SHW) or substrings (HW) of the right lengths.
+    If the table would be too large, or the read has non-ACGT bases in the search window,
+    it falls back to the edlib scan.
+    '''
+    def __init__(self, BarcodeDict, mismatch, mode='SHW', maxsize=1000000):
+        self.mismatch = int(mismatch)
+        self.mode = mode
+        self.barcodes = [(BL, BarcodeDict[BL]) for BL in BarcodeDict.keys()]
+        self.lengths = []
+        self.cache = {}
+        self.table = {}
+        if not self.barcodes:
+            return
+        self.window = max(len(B) for BL, B in self.barcodes) + self.mismatch
+        for order, (BL, B) in enumerate(self.barcodes):
+            for V, d in self.neighbours(B):
+                if V not in self.table:
+                    self.table[V] = [(order, d)]
+                else:
+                    self.table[V].append((order, d))
+            if len(self.table) > maxsize:
+                log.debug("Barcode neighbourhood table too large, using edlib barcode search")
+                self.table = None
+                break
+        if self.table is not None:
+            self.lengths = sorted(set([len(V) for V in self.table]))
+
+    def neighbours(self, B):
+        #breadth first search over single edits, level is the edit distance
+        found = {B: 0}
+        level = [B]
+        for d in range(1, self.mismatch+1):
+            nextlevel = []
+            for V in level:
+                for i in range(len(V)+1):
+                    for c in 'ACGT':
+                        edits = [V[:i] + c + V[i:]]
+                        if i < len(V):
+                            edits.append(V[:i] + c + V[i+1:])
+                        for E in edits:
+                            if E and E not in found:
+                                found[E] = d
+                                nextlevel.append(E)
+                    if i < len(V):
+                        E = V[:i] + V[i+1:]
+                        if E and E not in found:
+                            found[E] = d
+                            nextlevel.append(E)
+            level = nextlevel
+        return found.items()
+
+    def besthit(self, hits):
+        #same rules as AlignBarcode, first exact match in dictionary order, else lowest diffs
+        if not hits:
+            return "", ""
+        order = min(hits, key=lambda x: (hits[x], x))
+        if hits[order] > 0 and self.mismatch == 0:
+            return "", ""
+        return self.barcodes[order][1], self.barcodes[order][0]
+
+    def scan(self, Seq):
+        hits = {}
+        for order, (BL, B) in enumerate(self.barcodes):
+            align = edlib.align(B, Seq, mode=self.mode, k=self.mismatch)
+            if align["editDistance"] >= 0:
+                hits[order] = align["editDistance"]
+        return self.besthit(hits)
+
+    def search(self, Seq):
+        if not self.barcodes:
+            return "", ""
+        if self.mode == 'SHW':
+            #hit only depends on the start of the read, so results can be cached
+            Seq = Seq[:self.window]
+            if Seq in self.cache:
+                return self.cache[Seq]
+        if self.table is None or Seq.translate(None, 'ACGT'):
+            result = self.scan(Seq)
+        else:
+            hits = {}
+            if self.mode == 'SHW':
+                starts = [0]
+            else:
+                starts = range(len(Seq))
+            for i in starts:
+                for L in self.lengths:
+                    if i + L > len(Seq):
+                        break
+                    for order, d in self.table.get(Seq[i:i+L], []):
+                        if order not in hits or d < hits[order]:
+                            hits[order] = d
+            result = self.besthit(hits)
+        if self.mode == 'SHW':
+            if len(self.cache) > 100000:
+                self.cache = {}
+            self.cache[Seq] = result
+        return result
+
 def findFwdPrimer(primer, sequence, mismatch):
     return edlib.align(primer, sequence, mode="HW", k=mismatch, additionalEqualities=degenNuc)
 
 def findRevPrimer(primer, sequence, mismatch, degen):
     return edlib.align(primer, sequence, mode="HW", task="locations", k=mismatch, additionalEqualities=degenNuc) 
-      
-def MergeReads(R1, R2, tmpdir, outname, read_length, minlen, usearch, rescue, method, index, mismatch):
-    removelist = []
-    if mismatch == 0:
-        if checkBCinHeader(R1):
-            log.debug("Searching for index mismatches > 0: %s" % index) 
-            removelist = illuminaBCmismatch(R1, R2, index)
-            log.debug("Removing %i reads with index mismatch > 0" % len(removelist))  
-    pretrim_R1 = os.path.join(tmpdir, outname + '.pretrim_R1.fq')
-    pretrim_R2 = os.path.join(tmpdir, outname + '.pretrim_R2.fq')
-    log.debug("Removing index 3prime bp 'A' from reads")
-    trim3prime(R1, read_length, pretrim_R1, removelist)
-    trim3prime(R2, read_length, pretrim_R2, removelist)  
-    
-    #check that num sequences is identical
-    if not PEsanitycheck(pretrim_R1, pretrim_R2):
-        log.error("%s and %s are not properly paired, exiting" % (R1, R2))
-        sys.exit(1)
-        
-    #next run USEARCH/vsearch mergepe
-    merge_out = os.path.join(tmpdir, outname + '.merged.fq')
-    skip_for = os.path.join(tmpdir, outname + '.notmerged.R1.fq')
-    report = os.path.join(tmpdir, outname +'.merge_report.txt')
-    log.debug("Now merging PE reads")
-    if method == 'usearch':
-        cmd = [usearch, '-fastq_mergepairs', pretrim_R1, '-reverse', pretrim_R2, '-fastqout', merge_out, '-fastq_trunctail', '5', '-fastqout_notmerged_fwd', skip_for,'-minhsp', '12','-fastq_maxdiffs', '8', '-report', report, '-fastq_minmergelen', str(minlen)]
+
+def alignPrimer(primer, seqs, mismatch, task="distance"):
+    '''
+    edlib HW search for primer in a list of seqs with the degenerate base equalities.  The
+    bundled edlib wrapper (lib/edlib.pyx) sets up primer and equalities once and aligns the
+    whole list without the GIL, other edlib builds are called once per sequence.  Empty
+    sequences (e.g. nothing left after the barcode) are reported as not found by both
+    '''
+    if hasattr(edlib, 'align_batch'):
+        return edlib.align_batch(primer, seqs, mode="HW", task=task, k=mismatch, additionalEqualities=degenNuc)
+    return [edlib.align(primer, x, mode="HW", task=task, k=mismatch, additionalEqualities=degenNuc) if x
+            else {'editDistance': -1, 'alphabetLength': len(set(primer)), 'locations': [], 'cigar': None} for x in seqs]
+
+def anchoredPrimers(primer, seqs, mismatch, end=False, slack=10):
+    '''
+    edlib HW search for primer in a window of len(primer)+mismatch+slack bases at the start
+    of each sequence (or the end if end=True), only searching the whole read if the window misses.
+    Returns a list of (align, hit), locations are relative to sequence and hit is 'window', 'full'
+    or None if the primer was not found
+    '''
+    task = "locations" if end else "distance"
+    window = len(primer) + mismatch + slack
+    if end:
+        offsets = [max(len(x) - window, 0) for x in seqs]
     else:
-        cmd = ['vsearch', '--fastq_mergepairs', pretrim_R1, '--reverse', pretrim_R2, '--fastqout', merge_out, '--fastq_truncqual', '5', '--fastqout_notmerged_fwd', skip_for,'--fastq_maxdiffs', '8', '--fastq_minmergelen', str(minlen), '--fastq_allowmergestagger']
-    runSubprocess(cmd, log)
-    #now concatenate files for downstream pre-process_illumina.py script
-    final_out = os.path.join(tmpdir, outname)
-    tmp_merge = os.path.join(tmpdir, outname+'.tmp')
+        offsets = [0] * len(seqs)
+    aligns = alignPrimer(primer, [x[o:o+window] for x, o in itertools.izip(seqs, offsets)], mismatch, task)
+    results = []
+    retry = []
+    for i, (align, offset) in enumerate(itertools.izip(aligns, offsets)):
+        if align["editDistance"] >= 0:
+            if offset:
+                align["locations"] = [(x if x is None else x+offset, y+offset) for x, y in align["locations"]]
+            results.append((align, 'window'))
+        else:
+            results.append((align, None))
+            if len(seqs[i]) > window:
+                retry.append(i)
+    if retry:
+        for i, align in itertools.izip(retry, alignPrimer(primer, [seqs[x] for x in retry], mismatch, task)):
+            if align["editDistance"] >= 0:
+                results[i] = (align, 'full')
+            else:
+                results[i] = (align, None)
+    return results
+
+def anchoredPrimer(primer, sequence, mismatch, end=False, slack=10):
+    #single read version of anchoredPrimers
+    return anchoredPrimers(primer, [sequence], mismatch, end=end, slack=slack)[0]
+      
+class PhixScreen(object):
+    '''
+    k-mer screen for phiX reads, built from the phiX174 genome (NC_001422.1) that ships
+    in DB/phiX.fa.  Both strands of the circular genome
+    are indexed, a read is phiX if at least minfrac (and 2) of the k-mers sampled every
+    step bases are phiX k-mers.  Memory use is a few MB regardless of the input size
+    '''
+    def __init__(self, reference=None, k=16, step=4, minfrac=0.2):
+        from Bio.SeqIO.FastaIO import SimpleFastaParser
+        import string
+        if not reference:
+            reference = os.path.join(parentdir, 'DB', 'phiX.fa')
+        self.k = k
+        self.step = step
+        self.minfrac = minfrac
+        self.kmers = set()
+        comp = string.maketrans('ACGT', 'TGCA')
+        with open(reference, 'rU') as infile:
+            for title, seq in SimpleFastaParser(infile):
+                seq = seq.upper()
+                for strand in [seq, seq.translate(comp)[::-1]]:
+                    strand = strand + strand[:k-1]
+                    for i in range(len(strand) - k + 1):
+                        self.kmers.add(strand[i:i+k])
+
+    def isPhix(self, seq):
+        seq = seq.upper()
+        sampled = 0
+        hits = 0
+        for i in range(0, len(seq) - self.k + 1, self.step):
+            sampled += 1
+            if seq[i:i+self.k] in self.kmers:
+                hits += 1
+        return hits >= 2 and hits >= self.minfrac * sampled
+
+    def filter(self, inputs, output):
+        #one streaming pass over the FASTQ inputs, writes non-phiX reads to output and returns the phiX count
+        phix = 0
+        with SeqWriter(output) as outfile:
+            for input in inputs:
+                with zopen(input) as infile:
+                    for title, seq, qual in FastqGeneralIterator(infile):
+                        if self.isPhix(seq):
+                            phix += 1
+                        else:
+                            outfile.fastq(title, seq, qual)
+        return phix
+
+phixScreen = None
+def getPhixScreen():
+    #load the phiX k-mers once per process, returns False if DB/phiX.fa is missing
+    global phixScreen
+    if phixScreen is None:
+        if os.path.isfile(os.path.join(parentdir, 'DB', 'phiX.fa')):
+            phixScreen = PhixScreen()
+        else:
+            log.debug("DB/phiX.fa not found, using usearch -filter_phix, run `amptk install -i phiX` to restore it")
+            phixScreen = False
+    return phixScreen
+
+def usearchPhix(inputs, output, usearch, tmpdir):
+    #fallback when DB/phiX.fa is missing, returns None as usearch does not report a count
+    tmp_merge = output + '.cat'
     with open(tmp_merge, 'w') as cat_file:
-        shutil.copyfileobj(open(merge_out,'rU'), cat_file)
-        if rescue == 'on':
-            shutil.copyfileobj(open(skip_for,'rU'), cat_file)
-    #run phix removal
+        for input in inputs:
+            with open(input, 'rU') as infile:
+                shutil.copyfileobj(infile, cat_file)
     #since most users have 32 bit usearch, check size of file, if > 3 GB, split into parts
-    log.debug("Removing phix from %s" % outname)
     phixsize = getSize(tmp_merge)
-    phixcount = countfastq(tmp_merge)
     log.debug('File Size: %i bytes' % phixsize)
     if phixsize > 3e9:
         log.debug('FASTQ > 3 GB, splitting FASTQ file into chunks to avoid potential memory problems with 32 bit usearch')
         phixdir = os.path.join(tmpdir, 'phix_'+str(os.getpid()))
         os.makedirs(phixdir)
         num = round(int((phixsize / 3e9))) + 1
-        split_fastq(tmp_merge, phixcount, phixdir, int(num))
+        split_fastq(tmp_merge, None, phixdir, int(num))
         for file in os.listdir(phixdir):
             if file.endswith(".fq"):
-                output = os.path.join(phixdir, file+'.phix')
+                out = os.path.join(phixdir, file+'.phix')
                 file = os.path.join(phixdir, file)
-                cmd = [usearch, '-filter_phix', file, '-output', output]
+                cmd = [usearch, '-filter_phix', file, '-output', out]
                 runSubprocess(cmd, log)
-        with open(final_out, 'wb') as finalout:
+        with open(output, 'wb') as finalout:
             for file in os.listdir(phixdir):
                 if file.endswith('.phix'):
                     with open(os.path.join(phixdir, file), 'rU') as infile:
                         shutil.copyfileobj(infile, finalout)
         shutil.rmtree(phixdir)
     else:
-        cmd = [usearch, '-filter_phix', tmp_merge, '-output', final_out]
+        cmd = [usearch, '-filter_phix', tmp_merge, '-output', output]
         runSubprocess(cmd, log)
+    removefile(tmp_merge)
+    return None
+
+def MergeReads(R1, R2, tmpdir, outname, read_length, minlen, usearch, rescue, method, index, mismatch, threads=1, label=None):
+    checkindex = None
+    if mismatch == 0 and index:
+        if checkBCinHeader(R1):
+            log.debug("Searching for index mismatches > 0: %s" % index)
+            checkindex = index
+    pretrim_R1 = os.path.join(tmpdir, outname + '.pretrim_R1.fq')
+    pretrim_R2 = os.path.join(tmpdir, outname + '.pretrim_R2.fq')
+    merge_out = os.path.join(tmpdir, outname + '.merged.fq')
+    skip_for = os.path.join(tmpdir, outname + '.notmerged.R1.fq')
+    report = os.path.join(tmpdir, outname +'.merge_report.txt')
+    cmd = []
+    if method == 'usearch':
+        cmd = [usearch, '-fastq_mergepairs', pretrim_R1, '-reverse', pretrim_R2, '-fastqout', merge_out, '-fastq_trunctail', '5', '-fastqout_notmerged_fwd', skip_for,'-minhsp', '12','-fastq_maxdiffs', '8', '-report', report, '-fastq_minmergelen', str(minlen), '-threads', str(threads)]
+    elif method == 'vsearch':
+        cmd = ['vsearch', '--fastq_mergepairs', pretrim_R1, '--reverse', pretrim_R2, '--fastqout', merge_out, '--fastq_truncqual', '5', '--fastqout_notmerged_fwd', skip_for,'--fastq_maxdiffs', '8', '--fastq_minmergelen', str(minlen), '--fastq_allowmergestagger', '--threads', str(threads)]
+    #remove index mismatches, trim the 3prime 'A' and check pairing in one pass over R1/R2
+    #vsearch reads the trimmed reads through FIFOs, usearch gets temporary files
+    log.debug("Removing index 3prime bp 'A' from reads")
+    for file in [pretrim_R1, pretrim_R2]:
+        removefile(file)
+    try:
+        if method == 'native':
+            #merged in-process, no trimmed copies of the reads are written
+            log.debug("Now merging PE reads")
+            origcount, removed, merged = nativeMerge(R1, R2, read_length, merge_out, skip_for, checkindex, minlen, 8, 5, threads)
+            log.debug("Merged %i of %i read pairs" % (merged, origcount - removed))
+        elif method == 'vsearch' and hasattr(os, 'mkfifo'):
+            os.mkfifo(pretrim_R1)
+            os.mkfifo(pretrim_R2)
+            log.debug("Now merging PE reads")
+            log.debug(' '.join(cmd))
+            with open(report, 'w') as reportout:
+                proc = subprocess.Popen(cmd, stdout=reportout, stderr=subprocess.STDOUT)
+                try:
+                    origcount, removed = pairedTrim(R1, R2, read_length, pretrim_R1, pretrim_R2, checkindex, proc)
+                finally:
+                    ret = proc.wait()
+                    with open(report, 'rU') as reportin:
+                        log.debug(reportin.read())
+            if ret != 0:
+                raise IOError("vsearch exited with status %i, see %s" % (ret, report))
+        else:
+            origcount, removed = pairedTrim(R1, R2, read_length, pretrim_R1, pretrim_R2, checkindex)
+            log.debug("Now merging PE reads")
+            runSubprocess(cmd, log)
+    except ValueError as e:
+        log.error("%s, not properly paired, exiting" % e)
+        for file in [pretrim_R1, pretrim_R2, merge_out, skip_for, report]:
+            removefile(file)
+        sys.exit(1)
+    except IOError as e:
+        #a partial merge_out must not go on as if the sample was merged
+        log.error("Merging %s failed: %s, exiting" % (outname, e))
+        for file in [pretrim_R1, pretrim_R2, merge_out, skip_for]:
+            removefile(file)
+        sys.exit(1)
+    if checkindex:
+        log.debug("Removed %i reads with index mismatch > 0" % removed)
+    #now concatenate files for downstream pre-process_illumina.py script, removing phiX on the way
+    #phiX output goes to a temp name and is renamed when done, so a partial file is never mistaken for a finished sample
+    final_out = os.path.join(tmpdir, outname)
+    phix_out = final_out + '.phix.tmp'
+    inputs = [merge_out]
+    if rescue == 'on':
+        inputs.append(skip_for)
+    log.debug("Removing phix from %s" % outname)
+    screen = getPhixScreen()
+    if screen:
+        phixcount = screen.filter(inputs, phix_out)
+    else:
+        phixcount = usearchPhix(inputs, phix_out, usearch, tmpdir)
+    os.rename(phix_out, final_out)
+    if os.path.isfile(sidecarName(phix_out)):
+        os.rename(sidecarName(phix_out), sidecarName(final_out))
     #count output
-    origcount = countfastq(R1)
     finalcount = countfastq(final_out)
-    log.debug("Removed %i reads that were phiX" % (origcount - finalcount - len(removelist)))
+    if phixcount is None:
+        phixcount = origcount - finalcount - removed
+    log.debug("Removed %i reads that were phiX" % phixcount)
     pct_out = finalcount / float(origcount) 
     #clean and close up intermediate files
-    os.remove(merge_out)
-    os.remove(pretrim_R1)
-    os.remove(pretrim_R2)
-    os.remove(skip_for)
-    os.remove(tmp_merge)
-    return log.info('{0:,}'.format(finalcount) + ' reads passed ('+'{0:.1%}'.format(pct_out)+')')
+    for file in [merge_out, pretrim_R1, pretrim_R2, skip_for]:
+        removefile(file)
+    msg = '{0:,}'.format(finalcount) + ' reads passed ('+'{0:.1%}'.format(pct_out)+'), ' + '{0:,}'.format(phixcount) + ' phiX removed'
+    if label:
+        return log.info(label + ': ' + msg)
+    return log.info(msg)
+
+def mergeBatch(pairs, trimlen=None, minovlen=12, maxdiffs=8, minpctid=80, minmergelen=1, truncqual=5, qmax=41, k=8):
+    '''
+    ungapped paired-end merging for a batch of ((title, seq, qual), (title, seq, qual)) pairs.
+    Reads are trimmed to trimlen and truncated at the first base with Q <= truncqual, then the
+    overlap is the diagonal shared by most k-mers of R1 and reverse complemented R2.  Overlaps
+    need minovlen bases, <= maxdiffs differences and >= minpctid identity.  Overlapping bases
+    get posterior quality scores (Edgar & Flyvbjerg 2015), and read-through past either 5'
+    end is dropped.  Returns a list with a merged (title, seq, qual) or None for each pair
+    '''
+    import numpy as np
+    import string
+    N = len(pairs)
+    if not pairs:
+        return []
+    s1, q1, s2, q2 = [], [], [], []
+    for r1, r2 in pairs:
+        s1.append(r1[1][:trimlen])
+        q1.append(r1[2][:trimlen])
+        s2.append(r2[1][:trimlen])
+        q2.append(r2[2][:trimlen])
+
+    def matrix(strings, fill):
+        L = max(max([len(x) for x in strings]), 1)
+        return np.frombuffer(''.join([x.ljust(L, fill) for x in strings]), dtype=np.uint8).reshape(N, L)
+
+    def truncate(quals):
+        #length up to the first base with Q <= truncqual, padding is '~' so it never counts
+        lengths = np.array([len(x) for x in quals], dtype=np.int64)
+        bad = matrix(quals, '~') <= 33 + truncqual
+        return np.minimum(lengths, np.where(bad.any(1), bad.argmax(1), lengths))
+    l1 = truncate(q1)
+    l2 = truncate(q2)
+    #R2 is truncated at its 3' end and then reverse complemented
+    comp = string.maketrans('ACGTNacgtn', 'TGCANtgcan')
+    for i in range(N):
+        s1[i] = s1[i][:l1[i]]
+        q1[i] = q1[i][:l1[i]]
+        s2[i] = s2[i][:l2[i]].translate(comp)[::-1]
+        q2[i] = q2[i][:l2[i]][::-1]
+    SA = matrix(s1, '\x00')
+    SB = matrix(s2, '\x00')
+    QA = np.maximum(matrix(q1, '\x00').astype(np.int64) - 33, 0)
+    QB = np.maximum(matrix(q2, '\x00').astype(np.int64) - 33, 0)
+    n = SA.shape[1]
+    m = SB.shape[1]
+    #2 bit codes for ACGT, 4 for N, other IUPAC letters or padding
+    lut = np.empty(256, dtype=np.uint8)
+    lut.fill(4)
+    for i, c in enumerate('ACGT'):
+        lut[ord(c)] = i
+        lut[ord(c.lower())] = i
+    A = lut[SA]
+    B = lut[SB]
+
+    def kmers(C):
+        #k-mer code starting at each position and whether it has no N or padding
+        L = C.shape[1] - k + 1
+        if L < 1:
+            return np.zeros((N, 0), dtype=np.int64), np.zeros((N, 0), dtype=bool)
+        codes = np.zeros((N, L), dtype=np.int64)
+        bad = np.zeros((N, L), dtype=bool)
+        for t in range(k):
+            col = C[:, t:t+L]
+            codes = codes * 4 + (col & 3)
+            bad |= col == 4
+        return codes, ~bad
+    ka, va = kmers(A)
+    kb, vb = kmers(B)
+    #join k-mers on (pair, k-mer), the diagonal is the R1 position minus the R2 position
+    rowsA, posA = np.nonzero(va)
+    keysA = rowsA * 4**k + ka[rowsA, posA]
+    order = np.argsort(keysA, kind='mergesort')
+    keysA = keysA[order]
+    posA = posA[order]
+    rowsB, posB = np.nonzero(vb)
+    keysB = rowsB * 4**k + kb[rowsB, posB]
+    D = np.zeros(N, dtype=np.int64)
+    votes = np.zeros(N, dtype=np.int64)
+    if len(keysA) and len(keysB):
+        idx = np.minimum(np.searchsorted(keysA, keysB), len(keysA) - 1)
+        hit = keysA[idx] == keysB
+        diag = posA[idx[hit]] - posB[hit] + m
+        rows = rowsB[hit]
+        #most common diagonal for each pair
+        uniq, counts = np.unique(rows * (n + m) + diag, return_counts=True)
+        urows = uniq // (n + m)
+        order = np.lexsort((counts, urows))
+        last = np.append(urows[order][1:] != urows[order][:-1], True)
+        best = order[last]
+        D[urows[best]] = uniq[best] % (n + m) - m
+        votes[urows[best]] = counts[best]
+    #R1 base and quality aligned to each position of R2
+    j = np.arange(m)[None, :]
+    apos = j + D[:, None]
+    inA = (apos >= 0) & (apos < l1[:, None]) & (j < l2[:, None])
+    apos = np.clip(apos, 0, n - 1)
+    rows = np.arange(N)[:, None]
+    Aal = A[rows, apos]
+    SAal = SA[rows, apos]
+    QAal = QA[rows, apos]
+    okA = inA & (Aal < 4)
+    okB = inA & (B < 4)
+    known = okA & okB
+    same = known & (Aal == B)
+    overlap = inA.sum(1)
+    diffs = (known & ~same).sum(1)
+    mergelen = D + l2
+    ok = (votes >= 2) & (overlap >= minovlen) & (diffs <= maxdiffs) & (diffs * 100 <= (100 - minpctid) * overlap) & (mergelen >= minmergelen)
+    #posterior error probabilities for agreeing and disagreeing bases
+    pA = 10 ** (-QAal / 10.0)
+    pB = 10 ** (-QB / 10.0)
+    lo = np.minimum(pA, pB)
+    hi = np.maximum(pA, pB)
+    pSame = (pA * pB / 3) / (1 - pA - pB + 4 * pA * pB / 3)
+    pDiff = lo * (1 - hi / 3) / (lo + hi - 4 * lo * hi / 3)
+    Qpost = np.clip(np.rint(-10 * np.log10(np.select([same, known], [pSame, pDiff], 1.0))), 0, qmax).astype(np.int64)
+    useA = (okA & ~okB) | (known & ~same & (QAal > QB))
+    base = np.where(useA, SAal, SB)
+    qual = np.select([known, okA & ~okB, okB & ~okA], [Qpost, QAal, QB], np.minimum(QAal, QB)) + 33
+    cons = base.astype(np.uint8)
+    consq = np.clip(qual, 33, 126).astype(np.uint8)
+    results = []
+    for i in range(N):
+        if not ok[i]:
+            results.append(None)
+            continue
+        d = D[i]
+        j0 = max(0, -d)
+        j1 = min(l2[i], l1[i] - d)
+        seq = s1[i][:max(d, 0)] + cons[i, j0:j1].tostring() + s2[i][j1:]
+        qs = q1[i][:max(d, 0)] + consq[i, j0:j1].tostring() + q2[i][j1:]
+        results.append((pairs[i][0][0].split(' ')[0], seq, qs))
+    return results
+
+def nativeMerge(R1, R2, trimlen, merged, notmerged, index=None, minlen=1, maxdiffs=8, truncqual=5, cpus=1, batchsize=5000):
+    '''
+    merge R1/R2 with mergeBatch over cpus, merged reads are written to merged and the R1 of
+    pairs that did not merge to notmerged (trimmed to trimlen).  Pairs with an index mismatch
+    are dropped as in pairedTrim.  Returns (total, removed, merged) read counts
+    '''
+    params = {'trimlen': trimlen, 'minmergelen': minlen, 'maxdiffs': maxdiffs, 'truncqual': truncqual}
+    #pool workers are daemonic and cannot start their own pool, so merge in-process there
+    p = None
+    if cpus > 1 and not multiprocessing.current_process().daemon:
+        p = multiprocessing.Pool(cpus)
+    counts = [0, 0, 0]
+    def keep(pairs):
+        for r1, r2 in pairs:
+            counts[0] += 1
+            if index and indexMismatch(r1, r2, index):
+                counts[1] += 1
+                continue
+            yield r1, r2
+    pending = collections.deque()
+    batches = batch_iterator(keep(iterPairs(R1, R2)), batchsize)
+    try:
+        with SeqWriter(merged) as mergeout:
+            with SeqWriter(notmerged) as skipout:
+                while True:
+                    batch = next(batches, None)
+                    if batch:
+                        if p:
+                            pending.append((batch, p.apply_async(mergeBatch, [batch], params)))
+                        else:
+                            pending.append((batch, None))
+                        if len(pending) < cpus*2:
+                            continue
+                    if not pending:
+                        break
+                    batch, result = pending.popleft()
+                    if result:
+                        result = result.get()
+                    else:
+                        result = mergeBatch(batch, **params)
+                    for pair, read in itertools.izip(batch, result):
+                        if read:
+                            counts[2] += 1
+                            mergeout.fastq(*read)
+                        else:
+                            title, seq, qual = pair[0]
+                            skipout.fastq(title, seq[:trimlen], qual[:trimlen])
+    finally:
+        if p:
+            p.terminate()
+            p.join()
+    return counts[0], counts[1], counts[2]
 
 def dictFlip(input):
     #flip the list of dictionaries
@@ -656,40 +1771,73 @@ def utax2qiime(input, output):
                 outfile.write('%s\t%s\n' % (OTU, ';'.join(levList)))
 
   
-def barcodes2dict(input, mapDict, bcmismatch):
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    import edlib
-    #here expecting the index reads from illumina, create dictionary for naming?
-    Results = {}
-    NoMatch = []
-    for title, seq, qual in FastqGeneralIterator(gzopen(input)):
-        hit = [None, None, None]
-        titlesplit = title.split(' ')
-        readID = titlesplit[0]
-        orient = titlesplit[1]
-        if orient.startswith('2:'):
-            seq = revcomp_lib.RevComp(seq)
-        if seq in mapDict:
-            BC = mapDict.get(seq)
-            hit = [BC,seq, 0]
-        else:
-            for k,v in mapDict.items():
-                alignment = edlib.align(k, seq, mode="NW", k=bcmismatch)
-                if alignment["editDistance"] < 0:
-                    continue
-                if hit[0]:
-                    oldhit = hit[2]
-                    if alignment["editDistance"] < oldhit:
-                        hit = [v, k, alignment["editDistance"]]
-                else:
-                    hit = [v, k, alignment["editDistance"]]
-
-            if not hit[0]: #no match, discard read
-                NoMatch.append(readID)
+def correctIndex(seq, mapDict, bcmismatch, cache):
+    '''
+    return (SampleID, BarcodeSeq, diffs) for an index read sequence or None if no barcode
+    in mapDict is within bcmismatch, index sequences repeat a lot so results are memoised in cache
+    '''
+    if seq in cache:
+        return cache[seq]
+    hit = None
+    if seq in mapDict:
+        hit = (mapDict.get(seq), seq, 0)
+    else:
+        for k,v in mapDict.items():
+            alignment = edlib.align(k, seq, mode="NW", k=bcmismatch)
+            if alignment["editDistance"] < 0:
                 continue
-        if not readID in Results:
-            Results[readID] = (hit[0], hit[1], hit[2])
-    return Results, NoMatch
+            if not hit or alignment["editDistance"] < hit[2]:
+                hit = (v, k, alignment["editDistance"])
+    #keep memory bounded if there are lots of unique error containing index reads
+    if len(cache) > 1000000:
+        cache.clear()
+    cache[seq] = hit
+    return hit
+
+def indexRead(title, seq):
+    titlesplit = title.split(' ')
+    if titlesplit[1].startswith('2:'):
+        seq = revcomp_lib.RevComp(seq)
+    return titlesplit[0], seq
+
+def annotateIndex(input, R1, R2, mapDict, bcmismatch, outR1, outR2):
+    '''
+    walk the index, R1 and R2 reads together, writing R1/R2 reads whose index matches a
+    barcode in mapDict with the sample in the header (readID;barcodelabel=..;bcseq=..;bcdiffs=..;)
+    and dropping the rest, so no read to sample dictionary has to be held in memory
+    returns the number of read pairs and the number discarded
+    '''
+    cache = {}
+    Total = 0
+    NoMatch = 0
+    try:
+        with SeqWriter(outR1) as out1, SeqWriter(outR2) as out2, zopen(input) as indexfile:
+            index = FastqGeneralIterator(indexfile)
+            for (t1, s1, q1), (t2, s2, q2) in iterPairs(R1, R2):
+                Total += 1
+                try:
+                    title, seq, qual = next(index)
+                except StopIteration:
+                    log.error("%s has fewer reads than %s, exiting" % (input, R1))
+                    sys.exit(1)
+                readID, seq = indexRead(title, seq)
+                if pairID(readID) != pairID(t1):
+                    log.error("Index and R1/R2 reads are not in the same order: %s, exiting" % readID)
+                    sys.exit(1)
+                hit = correctIndex(seq, mapDict, bcmismatch, cache)
+                if not hit:
+                    NoMatch += 1
+                    continue
+                header = '%s;barcodelabel=%s;bcseq=%s;bcdiffs=%i;' % (readID, hit[0], hit[1], hit[2])
+                out1.fastq(header, s1, q1)
+                out2.fastq(header, s2, q2)
+            if next(index, None) is not None:
+                log.error("%s has more reads than %s, exiting" % (input, R1))
+                sys.exit(1)
+    except ValueError as e:
+        log.error("%s, not properly paired, exiting" % e)
+        sys.exit(1)
+    return Total, NoMatch
 
 def mapping2dict(input):
     #parse a qiime mapping file pull out seqs and ID into dictionary
@@ -713,25 +1861,153 @@ def mapping2dict(input):
                 sys.exit(1)
     return MapDict
 
-def runMultiProgress(function, inputList, cpus):
-    #setup pool
-    p = multiprocessing.Pool(cpus)
-    #setup results and split over cpus
-    tasks = len(inputList)
-    results = []
+progressQueue = None
+
+def initProgress(queue):
+    #pool initializer for runMultiProgress, workers send their counters back on this queue
+    global progressQueue
+    progressQueue = queue
+
+class Progress(object):
+    '''
+    counters of a runMultiProgress worker, call update() every so often with the current
+    list of counts (first one is number of reads) and bytes of input read so far.  Only the
+    change since the last update is sent, runMultiProgress adds them up for the final stats
+    '''
+    def __init__(self):
+        self.stats = None
+        self.bytes = 0
+
+    def update(self, stats, bytes=0):
+        if self.stats:
+            delta = [x - y for x, y in zip(stats, self.stats)]
+        else:
+            delta = list(stats)
+        if progressQueue is not None:
+            progressQueue.put(('stats', delta, bytes - self.bytes))
+        self.stats = list(stats)
+        self.bytes = bytes
+
+def progressTask(function, input):
+    #run function on input in a runMultiProgress worker, telling the parent when it is done or failed
+    try:
+        function(input)
+    except (Exception, SystemExit):
+        progressQueue.put(('error', traceback.format_exc(), 0))
+        return
+    progressQueue.put(('done', None, 0))
+
+def runMultiProgress(function, inputList, cpus, size=None):
+    '''
+    run function over each item of inputList on cpus, workers report counters with Progress
+    which are shown as reads/s and an ETA, by bytes of input if size (total bytes) is given or
+    else by inputs finished.  A failed worker stops the run straight away.
+    Returns the summed counters of all the workers
+    '''
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Pool(cpus, initializer=initProgress, initargs=(queue,))
     for i in inputList:
-        results.append(p.apply_async(function, [i]))
-    #refresh pbar every 5 seconds
-    while True:
-        incomplete_count = sum(1 for x in results if not x.ready())
-        if incomplete_count == 0:
-            break
-        sys.stdout.write("     Progress: %.2f%% \r" % (float(tasks - incomplete_count) / tasks * 100))
-        sys.stdout.flush()
-        time.sleep(1)
+        p.apply_async(progressTask, [function, i])
     p.close()
+    tasks = len(inputList)
+    finished = 0
+    finalstats = []
+    processed = 0
+    start = time.time()
+    shown = 0
+    while finished < tasks:
+        try:
+            status, data, num = queue.get(timeout=1)
+        except Queue.Empty:
+            status = None
+        if status == 'error':
+            p.terminate()
+            log.error("Worker failed, exiting\n%s" % data)
+            sys.exit(1)
+        elif status == 'done':
+            finished += 1
+        elif status == 'stats':
+            if not finalstats:
+                finalstats = data
+            else:
+                finalstats = [x + y for x, y in zip(finalstats, data)]
+            processed += num
+        #refresh the progress line once a second
+        elapsed = time.time() - start
+        if elapsed - shown < 1 and finished < tasks:
+            continue
+        shown = elapsed
+        if size:
+            done = min(float(processed) / size, 1.0)
+        else:
+            done = float(finished) / tasks
+        reads = finalstats[0] if finalstats else 0
+        eta = '%i:%02i' % divmod(int(elapsed * (1 - done) / done), 60) if done else '-'
+        rate = int(reads / elapsed) if elapsed else 0
+        sys.stdout.write("     Progress: %.2f%%, %s reads (%s reads/s), ETA %s     \r" % (done * 100, '{0:,}'.format(reads), '{0:,}'.format(rate), eta))
+        sys.stdout.flush()
     p.join()
+    return finalstats
 
+def demuxStream(input, function, output, cpus, total=None, batchsize=10000, workers='auto', store=False):
+    '''
+    stream FASTQ records from input in batches to function over cpus, function must
+    return a tuple of ([(BarcodeLabel, Seq, Qual), ...], [counts]).  Batches are written
+    in order straight to output and renamed R_1..R_n, so no chunk files or reindexing.
+    workers is 'threads', 'processes' or 'auto', which uses threads if the edlib build
+    releases the GIL for batches (align_batch), so workers share the barcode/primer tables.
+    If store is True a DemuxStore copy of output is written as well.  The sidecar of
+    output gets the sample index (see sampleIndex).
+    Returns the summed counts and a dictionary of reads per barcodelabel
+    '''
+    if workers == 'auto':
+        workers = 'threads' if hasattr(edlib, 'align_batch') else 'processes'
+    log.debug("Running demux over %i %s" % (cpus, workers))
+    if workers == 'threads':
+        from multiprocessing.pool import ThreadPool
+        p = ThreadPool(cpus)
+    else:
+        p = multiprocessing.Pool(cpus)
+    pending = collections.deque()
+    finalstats = []
+    count = 0
+    processed = 0
+    out = SeqWriter(output, samples=True)
+    if store:
+        binary = DemuxStoreWriter(storeName(output))
+    with zopen(input) as infile:
+        records = batch_iterator(FastqGeneralIterator(infile), batchsize)
+        while True:
+            batch = next(records, None)
+            if batch:
+                pending.append((len(batch), p.apply_async(function, [batch])))
+                #keep a few batches in flight per cpu, but don't read the whole file into memory
+                if len(pending) < cpus*2:
+                    continue
+            if not pending:
+                break
+            num, result = pending.popleft()
+            reads, stats = result.get()
+            for BarcodeLabel, Seq, Qual in reads:
+                count += 1
+                title = "R_%i;barcodelabel=%s;" % (count, BarcodeLabel)
+                out.fastq(title, Seq, Qual, BarcodeLabel)
+                if store:
+                    binary.add(title, Seq, Qual, BarcodeLabel)
+            if not finalstats:
+                finalstats = stats
+            else:
+                finalstats = [x + y for x, y in zip(finalstats, stats)]
+            processed += num
+            if total:
+                sys.stdout.write("     Progress: %.2f%% \r" % (float(processed) / total * 100))
+                sys.stdout.flush()
+    out.close()
+    if store:
+        binary.close(fastq=output)
+    p.close()
+    p.join()
+    return finalstats, out.samples
 
 def batch_iterator(iterator, batch_size):
     entry = True #Make sure we loop once
@@ -767,52 +2043,172 @@ def setupLogging(LOGNAME):
     fhnd.setFormatter(fileformat)
     log.addHandler(fhnd)
     
+def EEbatch(records, maxee=None, trunclen=None, truncee=None, maxns=None):
+    '''
+    expected errors filter for a batch of (title, seq, qual) tuples, quality strings are
+    decoded into one uint8 array and EE comes from a Phred+33 lookup table, so the whole
+    batch is done at once.  Reads are truncated to trunclen, then to the longest prefix
+    with EE <= truncee, then dropped if they are empty, EE > maxee or they have more than
+    maxns Ns.  returns list of passing (title, seq, qual) tuples (truncated)
+    '''
+    import numpy as np
+    if not records:
+        return []
+    lengths = np.array([len(x[2]) for x in records], dtype=np.int64)
+    if trunclen:
+        lengths = np.minimum(lengths, int(trunclen))
+    starts = np.zeros(len(records), dtype=np.int64)
+    starts[1:] = np.cumsum([len(x[2]) for x in records])[:-1]
+    quals = np.frombuffer(''.join([x[2] for x in records]), dtype=np.uint8)
+    #probability of error for each Phred+33 character, '!' and below is Q0
+    EElookup = 10 ** (-np.maximum(np.arange(256) - 33, 0) / 10.0)
+    #cumulative sum over the whole batch, EE of any read prefix is then a difference
+    cumEE = np.zeros(len(quals)+1)
+    np.cumsum(EElookup[quals], out=cumEE[1:])
+    if truncee is not None:
+        maxlen = np.searchsorted(cumEE, cumEE[starts] + float(truncee), side='right') - 1 - starts
+        lengths = np.minimum(lengths, maxlen)
+    ee = cumEE[starts + lengths] - cumEE[starts]
+    #as vsearch --fastq_filter (--fastq_minlen 1), truncee can cut a read down to nothing
+    keep = lengths > 0
+    if maxee is not None:
+        keep &= ee <= float(maxee)
+    if maxns is not None:
+        seqs = np.frombuffer(''.join([x[1] for x in records]), dtype=np.uint8)
+        cumN = np.zeros(len(seqs)+1, dtype=np.int64)
+        np.cumsum(seqs == ord('N'), out=cumN[1:])
+        keep &= (cumN[starts + lengths] - cumN[starts]) <= int(maxns)
+    passed = []
+    for i in np.flatnonzero(keep):
+        title, seq, qual = records[i]
+        L = lengths[i]
+        passed.append((title, seq[:L], qual[:L]))
+    return passed
+
+def EEFilter(input, output, maxee=None, trunclen=None, truncee=None, maxns=None, fasta=None, batchsize=10000):
+    '''
+    run EEbatch over a FASTQ file, writing passing reads to output (FASTQ) and optionally fasta
+    returns (total, passed) read counts
+    '''
+    total = 0
+    passed = 0
+    fastaout = None
+    if fasta:
+        fastaout = SeqWriter(fasta)
+    with SeqWriter(output) as out, zopen(input) as infile:
+        for batch in batch_iterator(FastqGeneralIterator(infile), batchsize):
+            total += len(batch)
+            for title, seq, qual in EEbatch(batch, maxee=maxee, trunclen=trunclen, truncee=truncee, maxns=maxns):
+                passed += 1
+                out.fastq(title, seq, qual)
+                if fastaout:
+                    fastaout.fasta(title, seq)
+    if fastaout:
+        fastaout.close()
+    return total, passed
+
 def FastMaxEEFilter(input, trunclen, maxee, output):
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    with open(output, 'w') as out:
-        with open(input, 'rU') as file:
-            for title, seq, qual in FastqGeneralIterator(file):
-                trunclen = int(trunclen)
-                Seq = seq[:trunclen]
-                Qual = qual[:trunclen]
-                ee = 0
-                for bp, Q in enumerate(Qual):
-                    q = int(ASCII.get(Q))
-                    P = 10**(float(-q)/10)
-                    ee += P
-                if ee <= float(maxee):
-                    out.write("@%s\n%s\n+\n%s\n" % (title, Seq, Qual))
+    EEFilter(input, output, maxee=maxee, trunclen=int(trunclen))
 
 def MaxEEFilter(input, maxee):
-    from Bio import SeqIO
-    with open(input, 'rU') as f:
-        for rec in SeqIO.parse(f, "fastq"):
-            ee = 0
-            for bp, Q in enumerate(rec.letter_annotations["phred_quality"]):
-                P = 10**(float(-Q)/10)
-                ee += P
-            if ee <= float(maxee):
-                rec.name = ""
-                rec.description = ""
-                yield rec
+    from Bio.Seq import Seq
+    from Bio.SeqRecord import SeqRecord
+    for batch in batch_iterator(FastqGeneralIterator(gzopen(input)), 10000):
+        for title, seq, qual in EEbatch(batch, maxee=maxee):
+            yield SeqRecord(Seq(seq), id=title.split(' ')[0], name="", description="", letter_annotations={"phred_quality": [ord(Q)-33 for Q in qual]})
                 
-def dereplicate(input, output):
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    seqs = {}
-    with open(input, 'rU') as file:
-        for title, sequence, qual in FastqGeneralIterator(file):
-            if sequence not in seqs:
-                if title.endswith(';'):
-                    seqs[sequence]=title+'size=1;'
-                else:
-                    seqs[sequence]=title+';size=1;'
+def getBarcodeLabel(title):
+    #pull the sample name out of a demuxed read header
+    if not 'barcodelabel=' in title:
+        return None
+    return title.split('barcodelabel=', 1)[-1].split(';')[0]
+
+def dereplicate(input, output, minsize=1, relabel=None, matrix=None, persample=None):
+    '''
+    dereplicate a FASTQ or FASTA file in a single pass, each unique sequence (ignoring case and
+    U/T, the first one seen is written) stores an integer count (and per barcodelabel counts if
+    matrix or persample is given).  Uniques are written to output (FASTA) sorted by decreasing
+    size with ;size=N; added, those seen < minsize times are dropped.
+    matrix is an optional tab delimited sample by unique count table, persample an optional dict
+    that gets {unique label: {sample: count}} for the uniques written.
+    returns (total reads, number of uniques, number of uniques written)
+    '''
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+    index = {}
+    labels = []
+    seqs = []
+    counts = []
+    samplecounts = collections.defaultdict(int)
+    samples = set()
+    total = 0
+    with zopen(input) as infile:
+        #a pipe can not seek, so the first line tells the format and is put back in front
+        first = infile.readline()
+        lines = itertools.chain([first], infile)
+        if first.startswith('>'):
+            records = SimpleFastaParser(lines)
+        else:
+            records = ((title, seq) for title, seq, qual in FastqGeneralIterator(lineReader(lines)))
+        for title, seq in records:
+            total += 1
+            #case and U/T do not make a different unique, as in vsearch
+            key = seq.upper().replace('U', 'T')
+            i = index.get(key)
+            if i is None:
+                i = len(labels)
+                index[key] = i
+                labels.append(title.split(' ')[0])
+                #the first sequence seen is written, share the string when it is already the key
+                seqs.append(key if key == seq else seq)
+                counts.append(1)
             else:
-                count = int(seqs[sequence].split('=')[-1].rstrip(';')) + 1
-                formated_string = seqs[sequence].rsplit('=', 1)[0]+'='+str(count)+';'
-                seqs[sequence] = formated_string
-    with open(output, 'w') as out:
-        for sequence in seqs:
-            out.write('>'+seqs[sequence]+'\n'+sequence+'\n')
+                counts[i] += 1
+            if matrix or persample is not None:
+                sample = getBarcodeLabel(title)
+                if sample:
+                    samples.add(sample)
+                    samplecounts[(i, sample)] += 1
+    #sort by size, ties stay in input order like vsearch
+    index = None
+    order = sorted(range(len(labels)), key=lambda x: -counts[x])
+    written = 0
+    with SeqWriter(output) as out:
+        for i in order:
+            if counts[i] < int(minsize):
+                break
+            written += 1
+            if relabel:
+                label = relabel + str(written)
+            else:
+                label = labels[i].rstrip(';')
+            labels[i] = label
+            out.fasta('%s;size=%i;' % (label, counts[i]), seqs[i])
+    if persample is not None:
+        for (i, sample), count in samplecounts.iteritems():
+            if counts[i] >= int(minsize):
+                persample.setdefault(labels[i], {})[sample] = count
+    if matrix:
+        samples = natsorted(samples)
+        with open(matrix, 'w') as out:
+            out.write('#Unique\t%s\n' % '\t'.join(samples))
+            for i in order[:written]:
+                out.write('%s\t%s\n' % (labels[i], '\t'.join([str(samplecounts.get((i, x), 0)) for x in samples])))
+    return total, len(counts), written
+
+def mapUniques(reads, db, uc_out, identity='0.97'):
+    '''
+    map reads to db with vsearch --usearch_global, each unique sequence only once.  The reads
+    are dereplicated keeping their counts per sample and the uniques (Uniq1..n) mapped to uc_out.
+    returns {unique label: {sample: count}} to fan the hits back out to an OTU table
+    (uc2otutable.OTUTabOut(uc_out, table, Uniques=...)), which is the same table as mapping every read
+    '''
+    uniques = {}
+    derep = uc_out + '.uniques.fa'
+    dereplicate(reads, derep, relabel='Uniq', persample=uniques)
+    cmd = ['vsearch', '--usearch_global', derep, '--strand', 'plus', '--id', str(identity), '--db', db, '--uc', uc_out]
+    runSubprocess(cmd, log)
+    removefile(derep)
+    return uniques
 
 def convertSize(num, suffix='B'):
     for unit in ['','K','M','G','T','P','E','Z']:
@@ -840,13 +2236,13 @@ def checkfastqsize(input):
 def fastqreindex(input, output):
     from Bio.SeqIO.QualityIO import FastqGeneralIterator
     count = 1
-    with open(output, 'w') as out:
+    with SeqWriter(output, samples=True) as out:
         with open(input, 'rU') as fastq:
             for title, sequence, qual in FastqGeneralIterator(fastq):
                 cols = title.split(';')
                 header = 'R_'+str(count)+';'+cols[1]+';'
                 count += 1
-                out.write("@%s\n%s\n+\n%s\n" % (header, sequence, qual))
+                out.fastq(header, sequence, qual)
 
 def which(name):
     try:
@@ -882,19 +2278,19 @@ def fastarename(input, relabel, output):
 
 def fasta_strip_padding(file, output):
     from Bio.SeqIO.FastaIO import FastaIterator
-    with open(output, 'w') as outputfile:
+    with SeqWriter(output) as outputfile:
         for record in FastaIterator(gzopen(file)):
-            Seq = record.seq.rstrip('N')   
-            outputfile.write(">%s\n%s\n" % (record.id, Seq))
+            Seq = str(record.seq).rstrip('N')   
+            outputfile.fasta(record.id, Seq)
 
 def fastq_strip_padding(file, output):
     from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    with open(output, 'w') as outputfile:
-        for title, seq, qual in FastqGeneralIterator(gzopen(file)):
+    with SeqWriter(output) as outputfile, zopen(file) as infile:
+        for title, seq, qual in FastqGeneralIterator(infile):
             Seq = seq.rstrip('N')
             Qual = qual[:len(Seq)]
             assert len(Seq) == len(Qual)    
-            outputfile.write("@%s\n%s\n+\n%s\n" % (title, Seq, Qual))
+            outputfile.fastq(title, Seq, Qual)
             
 def ReverseComp(input, output):
     with open(output, 'w') as revcomp:
@@ -989,8 +2385,11 @@ def parseMappingFileIllumina(input):
         return (samples, fwdprimer, revprimer)
                           
 def removefile(input):
-    if os.path.isfile(input):
+    #also removes the FIFOs used by MergeReads
+    if os.path.exists(input) and not os.path.isdir(input):
         os.remove(input)
+    if os.path.isfile(sidecarName(input)):
+        os.remove(sidecarName(input))
         
         
 '''        
@@ -1,6 +1,58 @@
+from libc.stdlib cimport malloc, free
 cimport cedlib
 
-def align(query, target, mode="NW", task="distance", k=-1):
+cdef cedlib.EdlibEqualityPair* _buildEqualities(additionalEqualities):
+    # Transform list of (char, char) pairs into c array, caller has to free it.
+    cdef cedlib.EdlibEqualityPair* cequalities = NULL
+    cdef int i
+    if additionalEqualities:
+        cequalities = <cedlib.EdlibEqualityPair*> malloc(len(additionalEqualities) * sizeof(cedlib.EdlibEqualityPair))
+        for i, (first, second) in enumerate(additionalEqualities):
+            cequalities[i].first = ord(first)
+            cequalities[i].second = ord(second)
+    return cequalities
+
+cdef cedlib.EdlibAlignConfig _buildConfig(mode, task, k, cedlib.EdlibEqualityPair* cequalities,
+                                          int numEqualities):
+    # Build an edlib config object based on given parameters.
+    cdef cedlib.EdlibAlignConfig cconfig = cedlib.edlibDefaultAlignConfig()
+    if k is not None: cconfig.k = k
+    if mode == 'NW': cconfig.mode = cedlib.EDLIB_MODE_NW
+    if mode == 'HW': cconfig.mode = cedlib.EDLIB_MODE_HW
+    if mode == 'SHW': cconfig.mode = cedlib.EDLIB_MODE_SHW
+    if task == 'distance': cconfig.task = cedlib.EDLIB_TASK_DISTANCE
+    if task == 'locations': cconfig.task = cedlib.EDLIB_TASK_LOC
+    if task == 'path': cconfig.task = cedlib.EDLIB_TASK_PATH
+    cconfig.additionalEqualities = cequalities
+    cconfig.additionalEqualitiesLength = numEqualities
+    return cconfig
+
+cdef _buildResult(cedlib.EdlibAlignResult cresult):
+    # Build python dictionary with results from result object that edlib returned, and free it.
+    cdef int i
+    cdef char* ccigar
+    locations = []
+    if cresult.numLocations >= 0:
+        for i in range(cresult.numLocations):
+            locations.append((cresult.startLocations[i] if cresult.startLocations else None,
+                              cresult.endLocations[i] if cresult.endLocations else None))
+    cigar = None
+    if cresult.alignment:
+        ccigar = cedlib.edlibAlignmentToCigar(cresult.alignment, cresult.alignmentLength,
+                                              cedlib.EDLIB_CIGAR_EXTENDED)
+        cigar = <bytes> ccigar
+        cigar = cigar.decode('UTF-8')
+        free(ccigar)
+    result = {
+        'editDistance': cresult.editDistance,
+        'alphabetLength': cresult.alphabetLength,
+        'locations': locations,
+        'cigar': cigar
+    }
+    cedlib.edlibFreeAlignResult(cresult)
+    return result
+
+def align(query, target, mode="NW", task="distance", k=-1, additionalEqualities=None):
     """ Align query with target using edit distance.
     @param {string} query
     @param {string} target
@@ -15,6 +67,10 @@ def align(query, target, mode="NW", task="distance", k=-1):
             - 'path' - find edit distance, start and end locations and alignment path.
     @param {int} k  Optional. Max edit distance to search for - the lower this value,
             the faster is calculation. Set to -1 (default) to have no limit on edit distance.
+    @param {list} additionalEqualities  Optional.
+            List of pairs of characters, where each pair defines two characters as equal.
+            This way you can extend edlib's definition of equality (which is that each character is equal only
+            to itself), e.g. [("R", "A"), ("R", "G")] for degenerate bases.
     @return Dictionary with following fields:
             {int} editDistance  -1 if it is larger than k.
             {int} alphabetLength
@@ -30,37 +86,60 @@ def align(query, target, mode="NW", task="distance", k=-1):
     cdef bytes target_bytes = target.encode();
     cdef char* ctarget = target_bytes;
 
-    # Build an edlib config object based on given parameters.
-    cconfig = cedlib.edlibDefaultAlignConfig()
-    if k is not None: cconfig.k = k
-    if mode == 'NW': cconfig.mode = cedlib.EDLIB_MODE_NW
-    if mode == 'HW': cconfig.mode = cedlib.EDLIB_MODE_HW
-    if mode == 'SHW': cconfig.mode = cedlib.EDLIB_MODE_SHW
-    if task == 'distance': cconfig.task = cedlib.EDLIB_TASK_DISTANCE
-    if task == 'locations': cconfig.task = cedlib.EDLIB_TASK_LOC
-    if task == 'path': cconfig.task = cedlib.EDLIB_TASK_PATH
+    cdef int numEqualities = len(additionalEqualities) if additionalEqualities else 0
+    cdef cedlib.EdlibEqualityPair* cequalities = _buildEqualities(additionalEqualities)
+    cdef cedlib.EdlibAlignConfig cconfig = _buildConfig(mode, task, k, cequalities, numEqualities)
 
     # Run alignment.
-    cresult = cedlib.edlibAlign(cquery, len(query), ctarget, len(target), cconfig)
+    cdef cedlib.EdlibAlignResult cresult = cedlib.edlibAlign(cquery, len(query_bytes), ctarget, len(target_bytes), cconfig)
+    free(cequalities)
 
-    # Build python dictionary with results from result object that edlib returned.
-    locations = []
-    if cresult.numLocations >= 0:
-        for i in range(cresult.numLocations):
-            locations.append((cresult.startLocations[i] if cresult.startLocations else None,
-                              cresult.endLocations[i] if cresult.endLocations else None))
-    cigar = None
-    if cresult.alignment:
-        ccigar = cedlib.edlibAlignmentToCigar(cresult.alignment, cresult.alignmentLength,
-                                              cedlib.EDLIB_CIGAR_EXTENDED)
-        cigar = <bytes> ccigar
-        cigar = cigar.decode('UTF-8')
-    result = {
-        'editDistance': cresult.editDistance,
-        'alphabetLength': cresult.alphabetLength,
-        'locations': locations,
-        'cigar': cigar
-    }
-    cedlib.edlibFreeAlignResult(cresult)
+    return _buildResult(cresult)
 
-    return result
+def align_batch(query, targets, mode="NW", task="distance", k=-1, additionalEqualities=None):
+    """ Align query with each of targets using edit distance.
+    Same as calling align() for each target, but query and equalities are converted only once
+    and all the alignments are done in one go without holding the GIL, so threads can run in parallel.
+    Empty targets are not aligned, their result has editDistance -1 (query not found).
+    Parameters are the same as for align(), except:
+    @param {[string]} targets  List of targets.
+    @return List of result dictionaries (see align()), in the same order as targets.
+    """
+    cdef bytes query_bytes = query.encode()
+    cdef char* cquery = query_bytes
+    cdef int queryLength = len(query_bytes)
+    cdef int numTargets = len(targets)
+    cdef int i
+    cdef bytes target_bytes
+    # Keep references to encoded targets so c strings stay valid while aligning.
+    targets_bytes = [target.encode() for target in targets]
+    cdef char** ctargets = <char**> malloc(numTargets * sizeof(char*))
+    cdef int* ctargetLengths = <int*> malloc(numTargets * sizeof(int))
+    cdef cedlib.EdlibAlignResult* cresults = <cedlib.EdlibAlignResult*> malloc(numTargets * sizeof(cedlib.EdlibAlignResult))
+    for i in range(numTargets):
+        target_bytes = targets_bytes[i]
+        ctargets[i] = target_bytes
+        ctargetLengths[i] = len(target_bytes)
+
+    cdef int numEqualities = len(additionalEqualities) if additionalEqualities else 0
+    cdef cedlib.EdlibEqualityPair* cequalities = _buildEqualities(additionalEqualities)
+    cdef cedlib.EdlibAlignConfig cconfig = _buildConfig(mode, task, k, cequalities, numEqualities)
+
+    # Run alignments.
+    with nogil:
+        for i in range(numTargets):
+            if ctargetLengths[i] > 0:
+                cresults[i] = cedlib.edlibAlign(cquery, queryLength, ctargets[i], ctargetLengths[i], cconfig)
+
+    results = []
+    for i in range(numTargets):
+        if ctargetLengths[i] > 0:
+            results.append(_buildResult(cresults[i]))
+        else:
+            results.append({'editDistance': -1, 'alphabetLength': len(set(query_bytes)),
+                            'locations': [], 'cigar': None})
+    free(cequalities)
+    free(ctargets)
+    free(ctargetLengths)
+    free(cresults)
+    return results
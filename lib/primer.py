@@ -188,6 +188,76 @@ def BestMatch2(Seq, Primer, MaxDiffs):
 			BestPos = Pos
 	return BestPos, BestDiffs
 
+# Bit-parallel version of BestMatch2.  Each base of the sequence becomes one bit in
+# four integers (one per A,C,G,T, set where the sequence letter allows that base), so
+# testing a primer letter at every offset at once is an OR of those integers.  Mismatches
+# are added up per offset in bit-sliced counters, and the best offset is the lowest set
+# bit of the smallest count <= MaxDiffs, so results are identical to BestMatch2.
+
+BaseTables = {}
+for Base in "ACGT":
+	Table = ""
+	for i in range(256):
+		c = chr(i).upper()
+		if c in LetterToSet and Base in LetterToSet[c]:
+			Table += "1"
+		else:
+			Table += "0"
+	BaseTables[Base] = Table
+
+CompiledPrimers = {}
+
+def CompilePrimer(Primer):
+	try:
+		return CompiledPrimers[Primer]
+	except KeyError:
+		pass
+	Bases = []
+	for c in Primer:
+		Bases.append(LetterToSet.get(c.upper(), ""))
+	CompiledPrimers[Primer] = Bases
+	return Bases
+
+def BaseBits(Seq):
+	Bits = {}
+	for Base in "ACGT":
+		Bits[Base] = int("0" + Seq.translate(BaseTables[Base])[::-1], 2)
+	return Bits
+
+def BestMatchFast(Seq, Primer, MaxDiffs):
+	Seq = str(Seq)
+	L = len(Seq)
+	PrimerLength = len(Primer)
+	Positions = L - PrimerLength + 1
+	if Positions <= 0:
+		return -1, PrimerLength
+	Bits = BaseBits(Seq)
+	Valid = (1 << Positions) - 1
+	Planes = [0]*PrimerLength.bit_length()
+	for i, Set in enumerate(CompilePrimer(Primer)):
+		Compat = 0
+		for Base in Set:
+			Compat |= Bits[Base]
+		x = ~(Compat >> i) & Valid
+		for k in range(0, len(Planes)):
+			if not x:
+				break
+			Carry = Planes[k] & x
+			Planes[k] ^= x
+			x = Carry
+	for d in range(0, min(MaxDiffs, PrimerLength - 1) + 1):
+		Mask = Valid
+		for k in range(0, len(Planes)):
+			if (d >> k) & 1:
+				Mask &= Planes[k]
+			else:
+				Mask &= ~Planes[k]
+			if not Mask:
+				break
+		if Mask:
+			return (Mask & -Mask).bit_length() - 1, d
+	return -1, PrimerLength
+
 def BestMatch3(Seq, Primer, MaxDiffs):
 	L = len(Seq)
 	PrimerLength = len(Primer)
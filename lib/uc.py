@@ -129,6 +129,86 @@ def GetRec(File, OnRecord):
 			return 0
 		return 1
 
+# Generator interface, Records() yields one UCRec per record instead of setting the
+# module globals and calling back, so several files can be read at the same time.
+# Only the fields listed in Fields are decoded, the others are left as None.
+
+AllFields = [ "Type", "ClusterNr", "Size", "PctId", "LocalScore", "Evalue", "Strand",
+  "QueryStart", "SeedStart", "Alignment", "QueryLabel", "TargetLabel" ]
+
+class UCRec(object):
+	__slots__ = AllFields
+
+	def __init__(self):
+		for Name in AllFields:
+			setattr(self, Name, None)
+
+def ToInt(s):
+	try:
+		return int(s)
+	except ValueError:
+		return -1
+
+def ToFloat(s):
+	try:
+		return float(s)
+	except ValueError:
+		return -1.0
+
+def PctIdField(s, i):
+	# PctId may be PctId/LocalScore/Evalue
+	Fields2 = s.split('/')
+	if len(Fields2) == 3:
+		return ToFloat(Fields2[i])
+	if i == 0:
+		return ToFloat(s)
+	return -1.0
+
+# Name -> (field index, decoder), decoder None means keep the string
+Decoders = {
+	"Type": (0, None),
+	"ClusterNr": (1, ToInt),
+	"Size": (2, ToInt),
+	"PctId": (3, lambda s: PctIdField(s, 0)),
+	"LocalScore": (3, lambda s: PctIdField(s, 1)),
+	"Evalue": (3, lambda s: PctIdField(s, 2)),
+	"Strand": (4, None),
+	"QueryStart": (5, ToInt),
+	"SeedStart": (6, ToInt),
+	"Alignment": (7, None),
+	"QueryLabel": (8, None),
+	"TargetLabel": (9, None),
+	}
+
+def Records(argFileName, Fields = None, Types = None):
+	if Fields is None:
+		Fields = AllFields
+	Wanted = [ (Name, Decoders[Name][0], Decoders[Name][1]) for Name in Fields ]
+	File = open(argFileName)
+	try:
+		for Line in File:
+			if Line[0] == '#':
+				continue
+			Line = Line.strip()
+			if len(Line) == 0:
+				continue
+			Cols = Line.split("\t")
+			N = len(Cols)
+			if N != 9 and N != 10:
+				Die("Expected 9 or 10 fields in .uc record, got: " + Line)
+			if Types != None and Cols[0] not in Types:
+				continue
+			Rec = UCRec()
+			for Name, i, Decode in Wanted:
+				if i < N:
+					if Decode == None:
+						setattr(Rec, Name, Cols[i])
+					else:
+						setattr(Rec, Name, Decode(Cols[i]))
+			yield Rec
+	finally:
+		File.close()
+
 def ReadRecs(argFileName, OnRecord, ShowProgress = True):
 	return ReadFile(argFileName, OnRecord, ShowProgress)
 
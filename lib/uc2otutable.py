@@ -2,16 +2,16 @@
 #script written by Robert Edgar http://drive5.com
 import sys
 import os
+import array
 import uc
 import die
 import fasta
 
-if len(sys.argv)<2:
-    print "Usage: " + sys.argv[0] + " table.uc table.otu.txt"
-    os._exit(1)
-
-FileName = sys.argv[1]
-OutName = sys.argv[2]
+# OTU table from the H records of a .uc mapping file, the in-process equivalent of
+# vsearch --otutabout.  OTU and sample names get integer ids through dicts and the
+# counts are kept as COO triples (OTU, sample, count), summed into CSR by Matrix().
+# Output format follows the extension: .biom (BIOM 1.0 json), .npz (compressed
+# sparse numpy arrays), anything else is a tab separated table.
 
 def GetSampleId(Label):
 	Fields = Label.split(";")
@@ -20,48 +20,185 @@ def GetSampleId(Label):
 			return Field[13:]
 	die.Die("barcodelabel= not found in read label '%s'" % Label)
 
-def OnRec():
-	global OTUs, Samples, OTUTable
-	if uc.Type != 'H':
-		return
+class OTUTable(object):
+	def __init__(self):
+		self.OTUIds = []
+		self.SampleIds = []
+		self.OTUIndex = {}
+		self.SampleIndex = {}
+		self.Rows = array.array('l')
+		self.Cols = array.array('l')
+		self.Counts = array.array('l')
 
-	OTUId = uc.TargetLabel
-	if OTUId not in OTUIds:
-		OTUIds.append(OTUId)
-		OTUTable[OTUId] = {}
+	def AddOTU(self, OTUId):
+		try:
+			return self.OTUIndex[OTUId]
+		except KeyError:
+			i = len(self.OTUIds)
+			self.OTUIndex[OTUId] = i
+			self.OTUIds.append(OTUId)
+			return i
 
-	SampleId = GetSampleId(uc.QueryLabel)
-	if SampleId not in SampleIds:
-		SampleIds.append(SampleId)
+	def AddSample(self, SampleId):
+		try:
+			return self.SampleIndex[SampleId]
+		except KeyError:
+			i = len(self.SampleIds)
+			self.SampleIndex[SampleId] = i
+			self.SampleIds.append(SampleId)
+			return i
 
-	N = fasta.GetSizeFromLabel(uc.QueryLabel, 1)
-	try:
-		OTUTable[OTUId][SampleId] += N
-	except:
-		OTUTable[OTUId][SampleId] = N
+	def Add(self, OTUId, SampleId, N = 1):
+		self.Rows.append(self.AddOTU(OTUId))
+		self.Cols.append(self.AddSample(SampleId))
+		self.Counts.append(N)
 
-OTUIds = []
-SampleIds = []
-OTUTable = {}
+	def AddUC(self, FileName, Targets = None, AllSamples = False, Uniques = None):
+		# Targets renames hit labels (e.g. iSeq -> OTU), hits to labels not in it are skipped.
+		# AllSamples adds a column for samples without any hits, as vsearch does.
+		# Uniques gives {sample: count} per query label (without ;size=) for mapped
+		# dereplicated sequences, see amptklib.mapUniques.
+		Types = "HN" if AllSamples else "H"
+		for Rec in uc.Records(FileName, ["Type", "QueryLabel", "TargetLabel"], Types = Types):
+			if Uniques != None:
+				Counts = Uniques.get(Rec.QueryLabel.split(";")[0], {}).items()
+			else:
+				Counts = [ (GetSampleId(Rec.QueryLabel), fasta.GetSizeFromLabel(Rec.QueryLabel, 1)) ]
+			OTUId = Rec.TargetLabel
+			if Targets != None:
+				OTUId = Targets.get(OTUId)
+			if Rec.Type != "H" or OTUId == None:
+				if AllSamples:
+					for SampleId, N in Counts:
+						self.AddSample(SampleId)
+				continue
+			for SampleId, N in Counts:
+				self.Add(OTUId, SampleId, N)
 
-uc.ReadRecs(FileName, OnRec)
+	def Total(self):
+		return sum(self.Counts)
 
-handle = open(OutName, 'w')
+	def Matrix(self):
+		# CSR arrays (data, indices, indptr) with one entry per non-zero OTU/sample pair
+		import numpy
+		NumSamples = max(len(self.SampleIds), 1)
+		Rows = numpy.array(self.Rows, dtype=numpy.int64)
+		Cols = numpy.array(self.Cols, dtype=numpy.int64)
+		Counts = numpy.array(self.Counts, dtype=numpy.int64)
+		Keys, Inverse = numpy.unique(Rows * NumSamples + Cols, return_inverse=True)
+		Data = numpy.zeros(len(Keys), dtype=numpy.int64)
+		numpy.add.at(Data, Inverse, Counts)
+		Indices = Keys % NumSamples
+		Indptr = numpy.searchsorted(Keys // NumSamples, numpy.arange(len(self.OTUIds) + 1))
+		return Data, Indices, Indptr
 
-s = "OTUId"
-for SampleId in SampleIds:
-	s += "\t" + SampleId
-s = s + '\n'
-handle.write(s)
+	def Order(self, Sort):
+		OTUOrder = range(len(self.OTUIds))
+		SampleOrder = range(len(self.SampleIds))
+		if Sort:
+			OTUOrder.sort(key=lambda i: self.OTUIds[i])
+			SampleOrder.sort(key=lambda i: self.SampleIds[i])
+		return OTUOrder, SampleOrder
 
-for OTUId in OTUIds:
-	s = OTUId
-	for SampleId in SampleIds:
-		try:
-			n = OTUTable[OTUId][SampleId]
-		except:
-			n = 0
-		s += "\t" + str(n)
-	s = s + '\n'
-	handle.write(s)
-handle.close()
\ No newline at end of file
+	def WriteTSV(self, OutName, Header = "OTUId", Sort = False):
+		Data, Indices, Indptr = self.Matrix()
+		OTUOrder, SampleOrder = self.Order(Sort)
+		Position = [0]*len(self.SampleIds)
+		for j, i in enumerate(SampleOrder):
+			Position[i] = j
+		handle = open(OutName, 'w')
+		handle.write(Header + "".join("\t" + self.SampleIds[i] for i in SampleOrder) + '\n')
+		for OTU in OTUOrder:
+			Row = [0]*len(self.SampleIds)
+			for k in range(Indptr[OTU], Indptr[OTU+1]):
+				Row[Position[Indices[k]]] = Data[k]
+			handle.write(self.OTUIds[OTU] + "".join("\t" + str(n) for n in Row) + '\n')
+		handle.close()
+
+	def WriteBiom(self, OutName, Sort = False):
+		import json
+		import datetime
+		Data, Indices, Indptr = self.Matrix()
+		OTUOrder, SampleOrder = self.Order(Sort)
+		Position = [0]*len(self.SampleIds)
+		for j, i in enumerate(SampleOrder):
+			Position[i] = j
+		Triples = []
+		for r, OTU in enumerate(OTUOrder):
+			for k in range(Indptr[OTU], Indptr[OTU+1]):
+				Triples.append([r, Position[Indices[k]], int(Data[k])])
+		Biom = {
+			"id": os.path.basename(OutName),
+			"format": "Biological Observation Matrix 1.0.0",
+			"format_url": "http://biom-format.org",
+			"type": "OTU table",
+			"generated_by": "amptk",
+			"date": datetime.datetime.now().isoformat(),
+			"matrix_type": "sparse",
+			"matrix_element_type": "int",
+			"shape": [len(self.OTUIds), len(self.SampleIds)],
+			"data": Triples,
+			"rows": [ { "id": self.OTUIds[i], "metadata": None } for i in OTUOrder ],
+			"columns": [ { "id": self.SampleIds[i], "metadata": None } for i in SampleOrder ],
+			}
+		handle = open(OutName, 'w')
+		json.dump(Biom, handle)
+		handle.close()
+
+	def WriteSparse(self, OutName):
+		import numpy
+		Data, Indices, Indptr = self.Matrix()
+		numpy.savez_compressed(OutName, data=Data, indices=Indices, indptr=Indptr,
+		  shape=numpy.array([len(self.OTUIds), len(self.SampleIds)]),
+		  otus=numpy.array(self.OTUIds), samples=numpy.array(self.SampleIds))
+
+	def Write(self, OutName, Sort = False):
+		if OutName.endswith('.biom'):
+			self.WriteBiom(OutName, Sort)
+		elif OutName.endswith('.npz'):
+			self.WriteSparse(OutName)
+		else:
+			self.WriteTSV(OutName, Sort = Sort)
+
+def FromUC(FileName, Targets = None, AllSamples = False, Uniques = None):
+	Table = OTUTable()
+	Table.AddUC(FileName, Targets, AllSamples, Uniques)
+	return Table
+
+def DBLabels(FileName):
+	# sequence labels of a FASTA file up to the first white space, as they are in a .uc file
+	Labels = []
+	for Line in open(FileName):
+		if Line.startswith(">"):
+			Labels.append(Line[1:].split()[0])
+	return Labels
+
+def OTUTabOut(FileName, OutName, Targets = None, Uniques = None, DB = None):
+	# same layout as vsearch --otutabout, OTUs and samples sorted by name.  DB is the FASTA
+	# that was mapped to (the OTU centroids when Targets is given), each of its sequences
+	# gets a row even if no reads hit it, as vsearch lists every --db sequence
+	Table = OTUTable()
+	if DB != None:
+		for Label in DBLabels(DB):
+			Table.AddOTU(Label)
+	Table.AddUC(FileName, Targets, AllSamples = True, Uniques = Uniques)
+	if OutName.endswith('.biom') or OutName.endswith('.npz'):
+		Table.Write(OutName, Sort = True)
+	else:
+		Table.WriteTSV(OutName, Header = "#OTU ID", Sort = True)
+	return Table
+
+def ClusterMap(FileName, Prefix = "OTU"):
+	# member -> centroid label from the .uc of vsearch --cluster_* --relabel Prefix,
+	# centroids are numbered in cluster order so cluster N is Prefix + str(N+1)
+	Map = {}
+	for Rec in uc.Records(FileName, ["ClusterNr", "QueryLabel"], Types = "SH"):
+		Map[Rec.QueryLabel] = Prefix + str(Rec.ClusterNr + 1)
+	return Map
+
+if __name__ == "__main__":
+	if len(sys.argv)<3:
+		print "Usage: " + sys.argv[0] + " table.uc table.otu.txt|table.biom|table.npz"
+		os._exit(1)
+
+	FromUC(sys.argv[1]).Write(sys.argv[2])
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 
-import sys, os, itertools, random, argparse
+import sys, os, itertools, random, argparse, inspect
 from natsort import natsorted
 from Bio import SeqIO
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.insert(0,parentdir)
+import lib.amptklib as amptklib
 
 class MyFormatter(argparse.ArgumentDefaultsHelpFormatter):
     def __init__(self,prog):
@@ -21,16 +25,8 @@ args=parser.parse_args()
 
 def countBarcodes(file):
     global BarcodeCount
-    #now loop through data and find barcoded samples, counting each.....
-    BarcodeCount = {}
-    with open(file, 'rU') as input:
-        header = itertools.islice(input, 0, None, 4)
-        for line in header:
-            ID = line.split("=")[-1].split(";")[0]
-            if ID not in BarcodeCount:
-                BarcodeCount[ID] = 1
-            else:
-                BarcodeCount[ID] += 1
+    #reads per sample from the demux sample index or read store, only reads the file if it has neither
+    BarcodeCount = amptklib.sampleIndex(file)[0]
 
     #now let's count the barcodes found and count the number of times they are found.
     barcode_counts = "%20s:  %s" % ('Sample', 'Count')
@@ -49,32 +45,51 @@ def filterSeqs(file, lst, out):
             if title in lst:
                output.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
 
-IndexSeqs(args.input)
+def storeSubsample(store, num, out):
+    #pick random reads per sample from the demux read store offsets, reads are written in file order
+    offsets = []
+    for sample in store.samples:
+        x = store.offsets[sample]
+        if len(x) > num:
+            x = random.sample(x, num)
+        offsets.extend(x)
+    with open(out, 'w') as output:
+        for title, seq, qual in store.records(offsets=offsets):
+            output.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+    return len(offsets)
+
 countBarcodes(args.input)
 print "----------------------------------"
 print "Now sub-sampling reads down to a max of %s per sample" % args.num_reads
-Reads = []
-for key, value in BarcodeCount.items():
-    sample = []
-    for rec in SeqIndex:
-        ID = rec.split("=")[-1].split(";")[0]
-        if key == ID:
-            sample.append(rec)
-    Reads.append(sample)
-print "Finished indexing reads, split up by barcodelabel"
-Subsample = []
-for line in Reads:
-    if len(line) > int(args.num_reads):
-        line = random.sample(line, int(args.num_reads))
-    Subsample.append(line)
+store = amptklib.openStore(args.input)
+if store:
+    with store:
+        count = storeSubsample(store, int(args.num_reads), args.out)
+    print "Finished randomly sampling reads from the read store, wrote %i sequences to %s" % (count, args.out)
+else:
+    IndexSeqs(args.input)
+    Reads = []
+    for key, value in BarcodeCount.items():
+        sample = []
+        for rec in SeqIndex:
+            ID = rec.split("=")[-1].split(";")[0]
+            if key == ID:
+                sample.append(rec)
+        Reads.append(sample)
+    print "Finished indexing reads, split up by barcodelabel"
+    Subsample = []
+    for line in Reads:
+        if len(line) > int(args.num_reads):
+            line = random.sample(line, int(args.num_reads))
+        Subsample.append(line)
 
-Subsample = [item for sublist in Subsample for item in sublist]
+    Subsample = [item for sublist in Subsample for item in sublist]
 
-#convert list to set for faster lookup
-Lookup = set(Subsample)
+    #convert list to set for faster lookup
+    Lookup = set(Subsample)
 
-print "Finished randomly sampling reads, now writing %i sequences to %s" % (len(Lookup), args.out)
-filterSeqs(args.input, Lookup, args.out)
+    print "Finished randomly sampling reads, now writing %i sequences to %s" % (len(Lookup), args.out)
+    filterSeqs(args.input, Lookup, args.out)
 print "----------------------------------"
 countBarcodes(args.out)
 print "----------------------------------"
@@ -25,55 +25,18 @@ parser.add_argument('-o','--out', help='Output for quality trimmed data')
 args=parser.parse_args()
 
 
-def batch_iterator(iterator, batch_size):
-    entry = True #Make sure we loop once
-    while entry :
-        batch = []
-        while len(batch) < batch_size :
-            try :
-                entry = iterator.next()
-            except StopIteration :
-                entry = None
-            if entry is None :
-                #End of file
-                break
-            batch.append(entry)
-        if batch :
-            yield batch
-
-def MaxEEFilter(records):
-    for rec in records:
-        rec = rec[:args.trunclen]
-        ee = 0
-        for bp, Q in enumerate(rec.letter_annotations["phred_quality"]):
-            P = 10**(float(-Q)/10)
-            ee += P
-        if ee <= args.maxee:
-            rec.name = ""
-            rec.description = ""
-            yield rec
-
-def worker(file):
-    name = file.split(".")[0]
-    filter_out = name + '.filter.fq'
+def worker(input):
+    #input is a (start, end) byte range of tmpinput
+    filter_out = os.path.join(folder, 'chunk_'+str(input[0])+'.filter.fq')
     with open(filter_out, 'w') as output:
-        with open(file, 'rU') as input:
-            SeqRecords = SeqIO.parse(file, 'fastq')
-            SeqIO.write(MaxEEFilter(SeqRecords), output, 'fastq')
+        for batch in amptklib.batch_iterator(amptklib.read_fastq_range(tmpinput, input[0], input[1]), 10000):
+            for title, seq, qual in amptklib.EEbatch(batch, maxee=args.maxee, trunclen=args.trunclen):
+                output.write("@%s\n%s\n+\n%s\n" % (title.split(' ')[0], seq, qual))
 
 def countBarcodes(file):
     global BarcodeCount
-    #now loop through data and find barcoded samples, counting each.....
-    BarcodeCount = {}
-    with open(file, 'rU') as input:
-        header = itertools.islice(input, 0, None, 4)
-        for line in header:
-            ID = line.split("=",1)[-1].split(";")[0]
-            if ID not in BarcodeCount:
-                BarcodeCount[ID] = 1
-            else:
-                BarcodeCount[ID] += 1
-            
+    #reads per sample from the demux sample index or read store, only reads the file if it has neither
+    BarcodeCount = amptklib.sampleIndex(file)[0]
 
     #now let's count the barcodes found and count the number of times they are found.
     barcode_counts = "%10s:  %s" % ('Sample', 'Count')
@@ -82,15 +45,8 @@ def countBarcodes(file):
     print("Found %i barcoded samples\n%s" % (len(BarcodeCount), barcode_counts))
 
 def getSeqLength(file):
-    seqlength = {}
-    with open(file, 'rU') as input:
-        header = itertools.islice(input, 1, None, 4)
-        for line in header:
-            length = len(line) - 1
-            if not length in seqlength:
-                seqlength[length] = 1
-            else:
-                seqlength[length] += 1
+    #read length histogram from the demux sample index or read store
+    seqlength = amptklib.sampleIndex(file)[1]
     lengthlist = []
     countlist = []
     for k,v in natsorted(seqlength.items()):
@@ -119,28 +75,24 @@ if args.quality_trim and not args.out:
 #main start here
 cpus = multiprocessing.cpu_count()
 print "----------------------------------"
-tmpinput = 'amptk_show.tmp'
-if args.input.endswith('.gz'):
-    amptklib.Funzip(args.input, tmpinput, cpus)
-else:
-    tmpinput = args.input
-countBarcodes(tmpinput)
+countBarcodes(args.input)
 print "----------------------------------"
-getSeqLength(tmpinput)
+getSeqLength(args.input)
 print "----------------------------------"
 if args.quality_trim:
+    #byte range splitting needs an uncompressed file
+    if args.input.endswith('.gz'):
+        tmpinput = 'amptk_show.tmp'
+        amptklib.Funzip(args.input, tmpinput, cpus)
+    else:
+        tmpinput = args.input
     #split the input FASTQ file into chunks to process
-    #split fastq file
-    SeqCount = amptklib.countfastq(tmpinput)
+    #split fastq file into byte ranges, each worker reads its own range
     pid = os.getpid()
     folder = 'amptk_tmp_' + str(pid)
-    amptklib.split_fastq(tmpinput, SeqCount, folder, cpus*2)    
-    #now get file list from tmp folder
-    file_list = []
-    for file in os.listdir(folder):
-        if file.endswith(".fq"):
-            file = os.path.join(folder, file)
-            file_list.append(file)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    file_list = amptklib.split_fastq_ranges(tmpinput, cpus*2)
 
     p = multiprocessing.Pool(cpus)
     for f in file_list:
@@ -151,18 +103,16 @@ if args.quality_trim:
 
     #get filtered results
     catDemux = args.out
-    with open(catDemux, 'w') as outfile:
+    with amptklib.zopen(catDemux, 'w', cpus) as outfile:
         for filename in glob.glob(os.path.join(folder,'*.filter.fq')):
             if filename == catDemux:
                 continue
             with open(filename, 'rU') as readfile:
                 shutil.copyfileobj(readfile, outfile)
-    if catDemux.endswith('.gz'):
-        amptklib.Fzip_inplace(catDemux)
     shutil.rmtree(folder)
     print "----------------------------------"
     countBarcodes(args.out)
     print "----------------------------------"
     print "Script finished, output in %s" % args.out
-
-amptklib.removefile(tmpinput)
+    if tmpinput != args.input:
+        amptklib.removefile(tmpinput)
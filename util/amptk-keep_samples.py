@@ -25,37 +25,43 @@ parser.add_argument('--format', default='fastq', choices=['fastq','fasta'], help
 args=parser.parse_args()
 
 def countBarcodes(file):
-    #now loop through data and find barcoded samples, counting each.....
-    BarcodeCount = {}
-    with open(file, 'rU') as input:
-        header = itertools.islice(input, 0, None, 4)
-        for line in header:
-            ID = line.split("=")[-1].split(";")[0]
-            if ID not in BarcodeCount:
-                BarcodeCount[ID] = 1
-            else:
-                BarcodeCount[ID] += 1
-    return BarcodeCount
+    #reads per sample from the demux sample index or read store, only reads the file if it has neither
+    return amptklib.sampleIndex(file)[0]
+
+def selectRecords(infile):
+    #reads of the samples to keep from a demux FASTQ
+    global total_count
+    for title, seq, qual in FastqGeneralIterator(infile):
+        total_count += 1
+        sample = title.split('=',1)[1].split(';')[0]
+        if not sample in keep_list:
+            continue
+        yield title, seq, qual
+
+def writeRecords(records, out):
+    global keep_count
+    for title, seq, qual in records:
+        keep_count += 1
+        if args.format == 'fastq':
+            out.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+        if args.format == 'fasta':
+            out.write(">%s\n%s\n" % (title, seq))
 
 def filter_sample(file, output):
-    global keep_count, total_count
-    with open(output, 'w') as out:
-        for title, seq, qual in FastqGeneralIterator(amptklib.gzopen(file)):
-            total_count += 1
-            sample = title.split('=',1)[1].split(';')[0]
-            if sample in keep_list:
-                keep_count += 1
-                if args.format == 'fastq':
-                    out.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
-                if args.format == 'fasta':
-                    out.write(">%s\n%s\n" % (title, seq))
-
-#check if input compressed, incompress if it is
-if args.input.endswith('.gz'):
-    SeqIn = args.input.replace('.gz', '')
-    amptklib.Funzip(args.input, SeqIn, multiprocessing.cpu_count())
-else:
-    SeqIn = args.input
+    global total_count
+    store = amptklib.openStore(file)
+    with amptklib.zopen(output, 'w') as out:
+        if store:
+            with store:
+                #only read the kept samples from the demux read store
+                total_count = store.total()
+                writeRecords(store.records([x for x in store.samples if x in keep_list]), out)
+        else:
+            with amptklib.zopen(file) as infile:
+                writeRecords(selectRecords(infile), out)
+
+#compressed input is read as a stream
+SeqIn = args.input
 
 keepers = []
 if args.threshold:
@@ -86,18 +92,8 @@ print("Keeping %i samples" % len(keep_list))
 keep_count = 0
 total_count = 0
 
-#rename to base
-if args.out.endswith('.gz'):
-    outfile = args.out.replace('.gz', '')
-else:
-    outfile = args.out
-#run filtering
-filter_sample(SeqIn, outfile)
-#compress and clean
-if args.out.endswith('.gz'): #compress in place
-    amptklib.Fzip_inplace(outfile)
-if args.input.endswith('.gz'):
-    amptklib.removefile(SeqIn)
+#run filtering, output is compressed on the fly if it ends in .gz
+filter_sample(SeqIn, args.out)
       
 print("Kept %i reads out of %i total reads" % (keep_count, total_count))
 
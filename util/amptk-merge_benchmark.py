@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+#compare the built-in paired-end merger (--merge_method native) against vsearch
+import sys, os, argparse, inspect, shutil, subprocess, time, glob
+from Bio.SeqIO.QualityIO import FastqGeneralIterator
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.insert(0,parentdir)
+import lib.amptklib as amptklib
+
+class MyFormatter(argparse.ArgumentDefaultsHelpFormatter):
+    def __init__(self,prog):
+        super(MyFormatter,self).__init__(prog,max_help_position=50)
+
+parser=argparse.ArgumentParser(prog='amptk-merge_benchmark.py',
+    description='''Script merges each R1/R2 pair in a folder with the native merger and vsearch, reporting speed and agreement.''',
+    epilog="""Written by Jon Palmer (2015) nextgenusfs@gmail.com""",
+    formatter_class=MyFormatter)
+
+parser.add_argument('-i','--input', default=os.path.join(parentdir, 'test_data', 'illumina_test_data'), help='Folder of R1/R2 FASTQ files')
+parser.add_argument('-l','--read_length', type=int, help='Trim reads to this length. Default: auto')
+parser.add_argument('--min_len', default=100, type=int, help='Minimum merged length')
+parser.add_argument('--vsearch', default='vsearch', help='vsearch executable')
+parser.add_argument('--cpus', default=1, type=int, help='Number of CPUs')
+parser.add_argument('-o','--out', default='amptk-merge_benchmark', help='Folder for merged files')
+args=parser.parse_args()
+
+def loadMerged(input):
+    merged = {}
+    for title, seq, qual in FastqGeneralIterator(open(input, 'rU')):
+        merged[title.split(' ')[0]] = seq
+    return merged
+
+if not os.path.isdir(args.out):
+    os.makedirs(args.out)
+vsearch = amptklib.which(args.vsearch)
+if not vsearch:
+    print "%s not found, only timing the native merger" % args.vsearch
+
+R1files = sorted(glob.glob(os.path.join(args.input, '*_R1_*.fastq*')))
+print "%-40s %8s %8s %8s %8s %8s %10s %10s" % ('Sample', 'Pairs', 'Native', 'vsearch', 'Both', 'Same', 'Native s', 'vsearch s')
+for R1 in R1files:
+    R2 = R1.replace('_R1_', '_R2_')
+    if not os.path.isfile(R2):
+        continue
+    name = os.path.basename(R1).split('_R1_')[0]
+    read_length = args.read_length or amptklib.GuessRL(R1)
+    native_out = os.path.join(args.out, name+'.native.fq')
+    native_skip = os.path.join(args.out, name+'.native.notmerged.fq')
+    start = time.time()
+    total, removed, merged = amptklib.nativeMerge(R1, R2, read_length, native_out, native_skip, minlen=args.min_len, cpus=args.cpus)
+    native_time = time.time() - start
+    native = loadMerged(native_out)
+    vs_count, both, same, vs_time = '-', '-', '-', '-'
+    if vsearch:
+        #same settings MergeReads uses for vsearch, on reads trimmed to the same length
+        trim_R1 = os.path.join(args.out, name+'.R1.fq')
+        trim_R2 = os.path.join(args.out, name+'.R2.fq')
+        amptklib.pairedTrim(R1, R2, read_length, trim_R1, trim_R2)
+        vs_out = os.path.join(args.out, name+'.vsearch.fq')
+        cmd = [args.vsearch, '--fastq_mergepairs', trim_R1, '--reverse', trim_R2, '--fastqout', vs_out, '--fastq_truncqual', '5', '--fastq_maxdiffs', '8', '--fastq_minmergelen', str(args.min_len), '--fastq_allowmergestagger', '--threads', str(args.cpus)]
+        start = time.time()
+        with open(os.devnull, 'w') as FNULL:
+            subprocess.call(cmd, stdout=FNULL, stderr=FNULL)
+        vs_time = '%.2f' % (time.time() - start)
+        vs = loadMerged(vs_out)
+        vs_count = len(vs)
+        shared = [x for x in native if x in vs]
+        both = len(shared)
+        same = sum(1 for x in shared if native[x] == vs[x])
+    print "%-40s %8s %8s %8s %8s %8s %10.2f %10s" % (name, total, merged, vs_count, both, same, native_time, vs_time)
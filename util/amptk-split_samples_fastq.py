@@ -53,14 +53,6 @@ ReverseCompRev = revcomp_lib.RevComp(RevPrimer)
 if args.platform == 'ion':
     FwdPrimer = 'A' + FwdPrimer
 
-def FindBarcode(Seq):
-    global Barcodes
-    for BarcodeLabel in Barcodes.keys():
-        Barcode = Barcodes[BarcodeLabel]
-        if Seq.startswith(Barcode):
-            return Barcode, BarcodeLabel
-    return "", ""
-
 def MatchesPrimer(Seq, Primer):
     return primer.MatchPrefix(Seq, Primer)
 
@@ -102,6 +94,7 @@ with open(args.barcodes, 'rU') as input:
             name = line[1:-1] + ".fastq"
             continue
         Barcodes[name]=line.strip()
+BarcodeIndex = amptklib.BarcodeIndex(Barcodes, 0)
 
 amptklib.log.info("Looking for %i barcodes and trimming primers\nFwdPrimer: %s\nRevPrimer: %s" % (len(Barcodes), FwdPrimer, RevPrimer))
 
@@ -113,7 +106,7 @@ BC = 0
 trim = len(FwdPrimer)
 with open(args.FASTQ, 'rU') as input:
     for title, seq, qual in FastqGeneralIterator(input):
-        Barcode, BarcodeLabel = FindBarcode(seq)
+        Barcode, BarcodeLabel = BarcodeIndex.search(seq)
         if Barcode == "": #if not found, move onto next record
             noBC += 1
             continue
@@ -130,7 +123,7 @@ with open(args.FASTQ, 'rU') as input:
         seq = seq[trim:]
         qual = qual[trim:]
         #look for reverse primer, strip if found
-        BestPosRev, BestDiffsRev = primer.BestMatch2(seq, ReverseCompRev, args.primer_mismatch)
+        BestPosRev, BestDiffsRev = primer.BestMatchFast(seq, ReverseCompRev, args.primer_mismatch)
         if BestPosRev > 0:
             seq = seq[:BestPosRev]
             qual = qual[:BestPosRev]
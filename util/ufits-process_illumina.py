@@ -125,7 +125,7 @@ def OnRec(Label, Seq, Qual):
     Seq = Seq[PL:]
     Qual = Qual[PL:]
 
-    BestPosRev, BestDiffsRev = primer.BestMatch2(Seq, RevPrimer, MAX_PRIMER_MISMATCHES)
+    BestPosRev, BestDiffsRev = primer.BestMatchFast(Seq, RevPrimer, MAX_PRIMER_MISMATCHES)
     if BestPosRev > 0:
         # Strip rev primer
         RevPrimerStrippedCount += 1